@@ -1,4 +1,3 @@
-import asyncio
 import logging
 import logging.handlers
 
@@ -8,12 +7,10 @@ from homeassistant.const import Platform
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers import config_validation as cv
 
-from .api.async_api import get_camera_profiles, refresh_cubo_token
+from .api.async_api import get_camera_profiles
 from .api.cuboai_functions import (
     load_access_token,
     load_refresh_token,
-    save_access_token,
-    save_refresh_token,
     set_token_paths,
 )
 from .const import DOMAIN
@@ -109,12 +106,34 @@ PLATFORMS: list[Platform] = [
 
 CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
 
+# Each poll runs the local TUTK fetch, token saves and image writes on the
+# executor. Home Assistant sizes it well above this; a host that shrinks it
+# starves under those bursts ("Executing handle took >0.1s" warnings).
+_MIN_EXECUTOR_WORKERS = 16
+
+
+def _warn_if_executor_small(hass: HomeAssistant) -> None:
+    """Log once if the default executor is too small for CuboAI's polling bursts.
+
+    Reads private asyncio attributes, so anything unexpected is ignored.
+    """
+    executor = getattr(hass.loop, "_default_executor", None)
+    workers = getattr(executor, "_max_workers", None)
+    if isinstance(workers, int) and workers < _MIN_EXECUTOR_WORKERS:
+        _LOGGER.warning(
+            "The default executor only has %d worker threads; CuboAI polling may queue behind other "
+            "integrations (at least %d recommended)",
+            workers,
+            _MIN_EXECUTOR_WORKERS,
+        )
+
 
 async def async_setup(hass: HomeAssistant, config: dict) -> bool:
     """Set up the CuboAI component."""
     # Set portable token storage and log paths based on HA config directory
     set_token_paths(hass.config.path())
     set_log_path(hass.config.path())
+    _warn_if_executor_small(hass)
 
     # Register frontend card
     try:
@@ -240,8 +259,9 @@ async def async_setup(hass: HomeAssistant, config: dict) -> bool:
             url = await manager.async_start_playback(cam, start_epoch, seconds)
 
             # Point the Recording camera at the freshly published stream.
+            recording_uid = f"cuboai_recording_camera_{device_id}"
             for entity in store.get("recording_cameras", []):
-                if entity.unique_id == f"cuboai_recording_camera_{device_id}":
+                if entity.unique_id == recording_uid:
                     entity.set_playback(url, start_epoch)
             _LOGGER.info(
                 "Playing recording for %s from %s for %ss",
@@ -328,13 +348,11 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
                 device_map = await get_camera_profiles(latest_access, user_agent, session)
             except aiohttp.ClientResponseError as e:
                 if e.status == 401:
+                    from .coordinator import async_refresh_tokens
+
                     _LOGGER.debug("Access token expired on startup, refreshing...")
-                    resp = await refresh_cubo_token(latest_refresh, user_agent, session)
-                    latest_access = resp.get("access_token")
-                    latest_refresh = resp.get("refresh_token", latest_refresh)
-                    await asyncio.gather(
-                        hass.async_add_executor_job(save_access_token, latest_access),
-                        hass.async_add_executor_job(save_refresh_token, latest_refresh),
+                    latest_access, latest_refresh = await async_refresh_tokens(
+                        hass, latest_refresh, user_agent, session
                     )
                     device_map = await get_camera_profiles(latest_access, user_agent, session)
                 else:
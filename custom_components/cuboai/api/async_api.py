@@ -5,6 +5,7 @@ eliminating the need for async_add_executor_job wrappers.
 """
 
 import aiohttp
+import orjson
 
 # API Base URLs
 MOBILE_API_BASE = "https://mobile-api.getcubo.com"
@@ -226,13 +227,11 @@ async def get_camera_profiles_raw(
 
 def _normalize_alert(alert: dict) -> dict:
     """Normalize alert data structure."""
-    import json
-
     params = alert.get("params")
     if isinstance(params, str):
         try:
-            params = json.loads(params)
-        except Exception:
+            params = orjson.loads(params)
+        except orjson.JSONDecodeError:
             pass
     return {
         "id": alert.get("id"),
@@ -1,5 +1,5 @@
-import base64
-import hashlib
+import binascii
+import functools
 import hmac
 import json
 import os
@@ -141,11 +141,31 @@ def load_refresh_token():
 
 # --- Cognito SRP Utilities ---
 
+# Challenges after PASSWORD_VERIFIER that are handed to the config flow's MFA step.
+_MFA_CHALLENGES = frozenset({"SMS_MFA", "SOFTWARE_TOKEN_MFA", "MFA_SETUP", "SELECT_MFA_TYPE"})
 
+
+class UnsupportedChallengeError(Exception):
+    """Cognito asked for a challenge the config flow cannot answer (e.g. NEW_PASSWORD_REQUIRED)."""
+
+    def __init__(self, challenge):
+        super().__init__(f"Unsupported Cognito challenge: {challenge}")
+        self.challenge = challenge
+
+
+@functools.lru_cache(maxsize=8)
+def _secret_hmac(client_secret):
+    """HMAC-SHA256 already keyed with client_secret (ipad/opad absorbed); .copy() before use."""
+    return hmac.new(client_secret.encode("utf-8"), digestmod="sha256")
+
+
+@functools.lru_cache(maxsize=128)
 def get_secret_hash(username, client_id, client_secret):
-    msg = username + client_id
-    dig = hmac.new(client_secret.encode("utf-8"), msg.encode("utf-8"), hashlib.sha256).digest()
-    return base64.b64encode(dig).decode()
+    # Copying the pre-keyed state skips re-deriving the padded keys per call.
+    mac = _secret_hmac(client_secret).copy()
+    mac.update((username + client_id).encode("utf-8"))
+    # b2a_base64 is what base64.b64encode wraps; call it directly.
+    return binascii.b2a_base64(mac.digest(), newline=False).decode("ascii")
 
 
 def initiate_user_srp_auth(username, password, pool_id, client_id, client_secret, user_agent, region="us-east-1"):
@@ -175,13 +195,17 @@ def respond_to_password_verifier(resp, aws, client, client_id, client_secret, us
         ClientId=client_id, ChallengeName="PASSWORD_VERIFIER", ChallengeResponses=challenge_responses
     )
     # Check if MFA is required
-    if "ChallengeName" in result:
+    challenge = result.get("ChallengeName")
+    if challenge in _MFA_CHALLENGES:
         return {
-            "challenge": result["ChallengeName"],
+            "challenge": challenge,
             "session": result["Session"],
             "challenge_params": result.get("ChallengeParameters", {}),
             "username": username,
         }
+    if challenge is not None:
+        # e.g. NEW_PASSWORD_REQUIRED: finish it in the CuboAI app, then retry.
+        raise UnsupportedChallengeError(challenge)
     return result["AuthenticationResult"]
 
 
@@ -196,9 +220,10 @@ def respond_to_mfa_challenge(
     # Create client inside executor job to avoid blocking the event loop
     client = boto3.client("cognito-idp", region_name=region)
 
+    secret_hash = get_secret_hash(username, client_id, client_secret)
     challenge_responses = {
         "USERNAME": username,
-        "SECRET_HASH": get_secret_hash(username, client_id, client_secret),
+        "SECRET_HASH": secret_hash,
     }
     # Different response key based on MFA type
     if challenge_name == "SOFTWARE_TOKEN_MFA":
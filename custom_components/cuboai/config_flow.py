@@ -104,46 +104,14 @@ class CuboAIConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                     self._username_input = user_input["username"]
                     return await self.async_step_mfa()
 
-                # Step 3: Decode ID Token and login to Cubo
-                uuid = api.decode_id_token(tokens["IdToken"])
-                _LOGGER.debug("Decoded UUID from ID token: %s", uuid)
-
-                data = await self.hass.async_add_executor_job(
-                    api.cubo_mobile_login, uuid, user_input["username"], tokens["AccessToken"], user_agent
+                # Step 3: Decode ID Token, login to Cubo and fetch cameras
+                return await self._async_finish_login(
+                    tokens, user_input["username"], user_agent, step_id="user", data_schema=AUTH_SCHEMA
                 )
-                _LOGGER.debug("Cubo mobile login successful")
-
-                access_token = data["access_token"]
-                refresh_token = data["refresh_token"]
-
-                _LOGGER.debug("Access token (first 20 chars): %s...", access_token[:20])
-                _LOGGER.debug("Refresh token (first 20 chars): %s...", refresh_token[:20])
-
-                # Fetch all cameras
-                device_map = await self.hass.async_add_executor_job(api.get_camera_profiles, access_token, user_agent)
-
-                if not device_map:
-                    _LOGGER.error("No cameras found for account")
-                    errors["base"] = "no_cameras"
-                    return self.async_show_form(step_id="user", data_schema=AUTH_SCHEMA, errors=errors)
-
-                # Store all cameras for setup
-                cameras = device_map
-
-                self._auth_data = {
-                    "uuid": uuid,
-                    "username": user_input["username"],
-                    "client_id": CLIENT_ID,
-                    "client_secret": CLIENT_SECRET,
-                    "pool_id": POOL_ID,
-                    "region": REGION,
-                    "access_token": access_token,
-                    "refresh_token": refresh_token,
-                    "user_agent": user_agent,
-                    "cameras": cameras,
-                }
-                return await self.async_step_select_cameras()
 
+            except api.UnsupportedChallengeError as e:
+                _LOGGER.warning("CuboAI authentication needs a step only the CuboAI app can finish: %s", e.challenge)
+                errors["base"] = "unsupported_challenge"
             except Exception as e:
                 error_str = str(e)
                 if "SMS QUOTA" in error_str.upper() or "UserLambdaValidationException" in error_str:
@@ -188,46 +156,9 @@ class CuboAIConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 _LOGGER.debug("MFA verification successful")
 
                 # Continue with normal flow - decode ID token and login to Cubo
-                uuid = api.decode_id_token(tokens["IdToken"])
-                _LOGGER.debug("Decoded UUID from ID token: %s", uuid)
-
-                data = await self.hass.async_add_executor_job(
-                    api.cubo_mobile_login, uuid, self._username_input, tokens["AccessToken"], self._user_agent
+                return await self._async_finish_login(
+                    tokens, self._username_input, self._user_agent, step_id="mfa", data_schema=MFA_SCHEMA
                 )
-                _LOGGER.debug("Cubo mobile login successful after MFA")
-
-                access_token = data["access_token"]
-                refresh_token = data["refresh_token"]
-
-                _LOGGER.debug("Access token (first 20 chars): %s...", access_token[:20])
-                _LOGGER.debug("Refresh token (first 20 chars): %s...", refresh_token[:20])
-
-                # Fetch all cameras
-                device_map = await self.hass.async_add_executor_job(
-                    api.get_camera_profiles, access_token, self._user_agent
-                )
-
-                if not device_map:
-                    _LOGGER.error("No cameras found for account")
-                    errors["base"] = "no_cameras"
-                    return self.async_show_form(step_id="mfa", data_schema=MFA_SCHEMA, errors=errors)
-
-                # Store all cameras for setup
-                cameras = device_map
-
-                self._auth_data = {
-                    "uuid": uuid,
-                    "username": self._username_input,
-                    "client_id": CLIENT_ID,
-                    "client_secret": CLIENT_SECRET,
-                    "pool_id": POOL_ID,
-                    "region": REGION,
-                    "access_token": access_token,
-                    "refresh_token": refresh_token,
-                    "user_agent": self._user_agent,
-                    "cameras": cameras,
-                }
-                return await self.async_step_select_cameras()
 
             except Exception as e:
                 error_str = str(e)
@@ -255,6 +186,47 @@ class CuboAIConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             step_id="mfa", data_schema=MFA_SCHEMA, errors=errors, description_placeholders=description_placeholders
         )
 
+    async def _async_finish_login(self, tokens, username, user_agent, step_id, data_schema):
+        """Log in to Cubo with the Cognito tokens and fetch the account's cameras.
+
+        Shared by the password and MFA steps. Errors propagate to the calling
+        step's handler; an account without cameras re-shows that step's form.
+        """
+        uuid = api.decode_id_token(tokens["IdToken"])
+        _LOGGER.debug("Decoded UUID from ID token: %s", uuid)
+
+        data = await self.hass.async_add_executor_job(
+            api.cubo_mobile_login, uuid, username, tokens["AccessToken"], user_agent
+        )
+        _LOGGER.debug("Cubo mobile login successful (%s step)", step_id)
+
+        access_token = data["access_token"]
+        refresh_token = data["refresh_token"]
+
+        _LOGGER.debug("Access token (first 20 chars): %s...", access_token[:20])
+        _LOGGER.debug("Refresh token (first 20 chars): %s...", refresh_token[:20])
+
+        # Fetch all cameras
+        cameras = await self.hass.async_add_executor_job(api.get_camera_profiles, access_token, user_agent)
+
+        if not cameras:
+            _LOGGER.error("No cameras found for account")
+            return self.async_show_form(step_id=step_id, data_schema=data_schema, errors={"base": "no_cameras"})
+
+        self._auth_data = {
+            "uuid": uuid,
+            "username": username,
+            "client_id": CLIENT_ID,
+            "client_secret": CLIENT_SECRET,
+            "pool_id": POOL_ID,
+            "region": REGION,
+            "access_token": access_token,
+            "refresh_token": refresh_token,
+            "user_agent": user_agent,
+            "cameras": cameras,
+        }
+        return await self.async_step_select_cameras()
+
     async def async_step_select_cameras(self, user_input=None):
         """Let the user choose which of the account's cameras to add.
 
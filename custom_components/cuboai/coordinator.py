@@ -1,9 +1,11 @@
 import asyncio
 import logging
+import time
 from datetime import timedelta
 
 import aiofiles.os
 import aiohttp
+import orjson
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
 
 from .api.async_api import (
@@ -16,7 +18,7 @@ from .api.async_api import (
 )
 from .api.cuboai_functions import save_access_token, save_refresh_token
 from .const import DEFAULT_UPDATE_INTERVAL, DOMAIN
-from .utils import log_to_file
+from .utils import gather_with_concurrency, log_to_file
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -33,6 +35,12 @@ _HISTORY_FIELDS = (
     "humidity_pct",
 )
 
+#: Alert photos fetched in parallel per camera per poll.
+_IMAGE_DOWNLOAD_CONCURRENCY = 4
+
+#: Profile `gender` codes as the app stores them; anything else is "unknown".
+_GENDER_TEXT = {0: "male", 1: "female"}
+
 
 def _history_payload(hist) -> dict:
     """Flatten a HistorySensors into plain data the entities can read.
@@ -306,6 +314,72 @@ def _fetch_local_data(
     return data
 
 
+#: Longest a backed-off cloud query may go unrefreshed.
+_BACKOFF_CAP = timedelta(minutes=15)
+
+_UNSET = object()
+
+
+class _PollBackoff:
+    """Poll schedule for cloud data that rarely changes.
+
+    Subscription status moves about once a month and the cloud camera state
+    only when the camera drops off or comes back, yet both used to be fetched
+    on every coordinator poll. Each unchanged answer doubles the wait before
+    the next query, up to `cap`; a changed answer, or an explicit reset(),
+    drops straight back to the base interval. A failed query is not recorded,
+    so the next poll simply retries it.
+    """
+
+    def __init__(self, base: timedelta, cap: timedelta = _BACKOFF_CAP):
+        self._base = base.total_seconds()
+        self._cap = max(cap.total_seconds(), self._base)
+        self._interval = self._base
+        self._next_due = 0.0
+        self.last = _UNSET
+
+    def due(self, now: float) -> bool:
+        return self.last is _UNSET or now >= self._next_due
+
+    def record(self, payload, now: float) -> None:
+        if payload == self.last:
+            self._interval = min(self._interval * 2, self._cap)
+        else:
+            self._interval = self._base
+            self.last = payload
+        # Half a second of slack so a poll landing exactly on the boundary
+        # (jitter in the coordinator's own timer) is not pushed a whole cycle.
+        self._next_due = now + self._interval - 0.5
+
+    def reset(self) -> None:
+        self._interval = self._base
+        self._next_due = 0.0
+
+
+async def _cached(value):
+    return value
+
+
+async def async_refresh_tokens(hass, refresh_token, user_agent, session) -> tuple[str, str]:
+    """Trade the refresh token for new tokens and persist both.
+
+    The one refresh path for the integration: the coordinator's 401 retry
+    and the startup camera sync in __init__ both go through here. Returns
+    (access_token, refresh_token); the old refresh token is kept when the
+    API does not rotate it.
+    """
+    resp = await refresh_cubo_token(refresh_token, user_agent, session)
+    if "access_token" not in resp:
+        raise UpdateFailed("Failed to refresh token: no access token in response")
+    access_token = resp["access_token"]
+    refresh_token = resp.get("refresh_token", refresh_token)
+    await asyncio.gather(
+        hass.async_add_executor_job(save_access_token, access_token),
+        hass.async_add_executor_job(save_refresh_token, refresh_token),
+    )
+    return access_token, refresh_token
+
+
 class CuboAICoordinator(DataUpdateCoordinator):
     """Class to manage fetching data from CuboAI API centrally."""
 
@@ -328,10 +402,17 @@ class CuboAICoordinator(DataUpdateCoordinator):
         # the last-good record re-aged instead of an unavailable gap. Only
         # this coordinator's (serialized) updates touch them.
         self._history_caches: dict[str, dict] = {}
+        # Subscription (account-wide) and per-camera cloud state are queried on
+        # a backed-off schedule — see _PollBackoff.
+        self._subscription_backoff = _PollBackoff(timedelta(seconds=interval))
+        self._state_backoffs: dict[str, _PollBackoff] = {}
+        # Whether each camera's local fetch worked on the previous poll.
+        self._local_ok: dict[str, bool] = {}
 
         # Portable image storage path
         self._images_dir = self._get_images_dir()
         self._web_base = "/local/cuboai_images"
+        self._web_prefix = self._web_base + "/"
 
     def _get_images_dir(self) -> str:
         """Get the images directory path with legacy fallback for backwards compatibility."""
@@ -402,20 +483,22 @@ class CuboAICoordinator(DataUpdateCoordinator):
         except Exception as e:
             log_to_file(f"[CuboAICoordinator] Error cleaning images for {device_id}: {e}")
 
+    async def _download_alert_image(self, device_id, url, filename, session):
+        """Fetch one alert photo; returns its /local path, or None if the download failed."""
+        try:
+            await download_image(url, self._access_token, self._user_agent, self._images_dir, filename, session)
+        except Exception as e:
+            log_to_file(f"[CuboAICoordinator] Image download failed for {device_id}: {e}")
+            return None
+        return self._web_prefix + filename
+
     async def _refresh_tokens(self, session):
         """Single centralized token refresh."""
         log_to_file("[CuboAICoordinator] Refreshing tokens centrally")
-        resp = await refresh_cubo_token(self._refresh_token, self._user_agent, session)
-        if "access_token" in resp:
-            self._access_token = resp["access_token"]
-            self._refresh_token = resp.get("refresh_token", self._refresh_token)
-            await asyncio.gather(
-                self.hass.async_add_executor_job(save_access_token, self._access_token),
-                self.hass.async_add_executor_job(save_refresh_token, self._refresh_token),
-            )
-            log_to_file("[CuboAICoordinator] Tokens successfully refreshed and saved")
-        else:
-            raise UpdateFailed("Failed to refresh token: no access token in response")
+        self._access_token, self._refresh_token = await async_refresh_tokens(
+            self.hass, self._refresh_token, self._user_agent, session
+        )
+        log_to_file("[CuboAICoordinator] Tokens successfully refreshed and saved")
 
     async def _async_update_data(self) -> dict:
         """Fetch all data for all cameras in a single pass."""
@@ -449,8 +532,6 @@ class CuboAICoordinator(DataUpdateCoordinator):
 
     async def _fetch_all(self, session) -> dict:
         """Single coordinated fetch of all data."""
-        import json as _json
-
         from homeassistant.util.dt import utcnow
 
         cameras = self._entry.data.get("cameras", [])
@@ -458,12 +539,16 @@ class CuboAICoordinator(DataUpdateCoordinator):
             cameras = [{"device_id": self._entry.data["device_id"], "baby_name": self._entry.data["baby_name"]}]
 
         result = {"cameras": {}, "subscription": None, "last_updated": utcnow().isoformat()}
+        now = time.monotonic()
 
         # Concurrently fetch raw profiles for all cameras and subscription info
         try:
+            sub_due = self._subscription_backoff.due(now)
             profiles_raw, sub_info = await asyncio.gather(
                 asyncio.wait_for(get_camera_profiles_raw(self._access_token, self._user_agent, session), timeout=10.0),
-                asyncio.wait_for(get_subscription_info(self._access_token, self._user_agent, session), timeout=10.0),
+                asyncio.wait_for(get_subscription_info(self._access_token, self._user_agent, session), timeout=10.0)
+                if sub_due
+                else _cached(self._subscription_backoff.last),
                 return_exceptions=True,
             )
 
@@ -473,6 +558,8 @@ class CuboAICoordinator(DataUpdateCoordinator):
                 log_to_file(f"[CuboAICoordinator] Failed to fetch subscription: {sub_info}")
                 result["subscription"] = None
             else:
+                if sub_due:
+                    self._subscription_backoff.record(sub_info, now)
                 result["subscription"] = sub_info
 
             if isinstance(profiles_raw, Exception):
@@ -484,6 +571,13 @@ class CuboAICoordinator(DataUpdateCoordinator):
             log_to_file(f"[CuboAICoordinator] Error fetching common data: {e}")
             profiles_raw = []
 
+        # Index profiles by device once per poll instead of scanning the list per camera.
+        # setdefault keeps the first entry for a device, as the old scan did.
+        profiles_by_device: dict[str, dict] = {}
+        for item in profiles_raw:
+            if isinstance(item, dict):
+                profiles_by_device.setdefault(item.get("device_id"), item)
+
         # Process per-camera data
         for camera in cameras:
             device_id = camera["device_id"]
@@ -496,25 +590,24 @@ class CuboAICoordinator(DataUpdateCoordinator):
             cam_data = {"profile": {}, "alerts": [], "latest_alert": None, "camera_state": {}, "local": {}}
 
             # 1. Profile Data
-            for item in profiles_raw:
-                if isinstance(item, dict) and item.get("device_id") == device_id:
-                    profile_str = item.get("profile", "{}")
-                    try:
-                        profile = _json.loads(profile_str)
-                    except Exception:
-                        profile = {}
-
-                    gender = profile.get("gender")
-                    gender_text = "male" if gender == 0 else "female" if gender == 1 else "unknown"
-                    cam_data["profile"] = {
-                        "baby": profile.get("baby"),
-                        "birth": profile.get("birth"),
-                        "gender": gender_text,
-                        "device_id": device_id,
-                    }
-                    break
+            item = profiles_by_device.get(device_id)
+            if item is not None:
+                profile_str = item.get("profile", "{}")
+                try:
+                    profile = orjson.loads(profile_str)
+                except Exception:
+                    profile = {}
+
+                cam_data["profile"] = {
+                    "baby": profile.get("baby"),
+                    "birth": profile.get("birth"),
+                    "gender": _GENDER_TEXT.get(profile.get("gender"), "unknown"),
+                    "device_id": device_id,
+                }
 
             # Concurrently fetch alerts and state for this camera
+            state_backoff = self._state_backoffs.setdefault(device_id, _PollBackoff(self.update_interval))
+            state_due = state_backoff.due(now)
             old_local = {}
             try:
                 if hasattr(self, "data") and self.data and "cameras" in self.data and device_id in self.data["cameras"]:
@@ -533,7 +626,9 @@ class CuboAICoordinator(DataUpdateCoordinator):
                     ),
                     asyncio.wait_for(
                         get_camera_state(device_id, self._access_token, self._user_agent, session), timeout=10.0
-                    ),
+                    )
+                    if state_due
+                    else _cached(state_backoff.last),
                     asyncio.wait_for(
                         self.hass.async_add_executor_job(
                             _fetch_local_data,
@@ -567,12 +662,23 @@ class CuboAICoordinator(DataUpdateCoordinator):
             if isinstance(state_data, BaseException):
                 log_to_file(f"[CuboAICoordinator] State fetch failed for {device_id}: {state_data}")
             elif state_data:
+                if state_due:
+                    state_backoff.record(state_data, now)
                 cam_data["camera_state"] = state_data
 
             # local_data is a BaseException (timeout/crash) OR a dict that is empty
             # on failure (the executor fn swallows most errors and returns {}). Treat
             # "usable" as a truthy, non-exception dict so BOTH failure modes are caught.
             local_ok = bool(local_data) and not isinstance(local_data, BaseException)
+            was_local_ok = self._local_ok.get(device_id, local_ok)
+            self._local_ok[device_id] = local_ok
+            if uid and local_ok != was_local_ok:
+                # The camera just stopped (or started) answering locally — the
+                # first sign it went offline (or came back), so re-ask the cloud
+                # on the next poll instead of waiting out a backed-off state
+                # query. Only on a change: a camera whose local link never works
+                # would otherwise reset (and so never back off) every poll.
+                state_backoff.reset()
             if isinstance(local_data, BaseException):
                 log_to_file(f"[CuboAICoordinator] Local data fetch failed for {device_id}: {local_data}")
             elif local_ok:
@@ -635,50 +741,49 @@ class CuboAICoordinator(DataUpdateCoordinator):
 
             alert_dicts = []
             if alerts_data:
+                # Read once per camera: the property re-resolves options/data
+                # on every access, and options cannot change mid-poll.
+                download_images = self.download_images
                 exists = await aiofiles.os.path.exists(self._images_dir)
-                if self.download_images and not exists:
+                if download_images and not exists:
                     try:
                         await aiofiles.os.makedirs(self._images_dir, exist_ok=True)
                     except Exception as e:
                         log_to_file(f"[CuboAICoordinator] Failed to create images dir: {e}")
 
+                downloads = []
+                image_prefix = device_id + "_"
                 for alert in alerts_data:
-                    params = alert.get("params")
-                    if isinstance(params, str):
-                        try:
-                            params = _json.loads(params)
-                        except Exception:
-                            pass
-
-                    local_image_path = None
-                    if self.download_images and alert.get("image"):
-                        filename = f"{device_id}_{alert.get('id')}.jpg"
-                        try:
-                            await download_image(
-                                alert.get("image"),
-                                self._access_token,
-                                self._user_agent,
-                                self._images_dir,
-                                filename,
-                                session,
-                            )
-                            local_image_path = f"{self._web_base}/{filename}"
-                        except Exception as e:
-                            log_to_file(f"[CuboAICoordinator] Image download failed for {device_id}: {e}")
-
-                    alert_dicts.append(
-                        {
-                            "type": alert.get("type"),
-                            "created": alert.get("created"),
-                            "params": params,
-                            "image": local_image_path,
-                            "id": alert.get("id"),
-                            "ts": alert.get("ts"),
-                            "device_id": alert.get("device_id"),
-                        }
+                    # params were already decoded by async_api._normalize_alert.
+                    alert_dict = {
+                        "type": alert.get("type"),
+                        "created": alert.get("created"),
+                        "params": alert.get("params"),
+                        "image": None,
+                        "id": alert.get("id"),
+                        "ts": alert.get("ts"),
+                        "device_id": alert.get("device_id"),
+                    }
+                    alert_dicts.append(alert_dict)
+                    if download_images and alert.get("image"):
+                        filename = image_prefix + str(alert.get("id")) + ".jpg"
+                        downloads.append((alert_dict, alert.get("image"), filename))
+
+                # Downloads overlap, but only a few at a time: each file write
+                # goes through aiofiles and so occupies an executor thread, and
+                # a backlog of alert photos must not crowd out other integrations.
+                if downloads:
+                    paths = await gather_with_concurrency(
+                        _IMAGE_DOWNLOAD_CONCURRENCY,
+                        *(
+                            self._download_alert_image(device_id, url, filename, session)
+                            for _, url, filename in downloads
+                        ),
                     )
+                    for (alert_dict, _, _), path in zip(downloads, paths):
+                        alert_dict["image"] = path
 
-                if self.download_images:
+                if download_images:
                     await self.hass.async_add_executor_job(self._cleanup_old_images, device_id, self.max_saved_photos)
 
                 if alert_dicts:
@@ -69,6 +69,22 @@ def log_to_file(msg):
         pass
 
 
+async def gather_with_concurrency(limit: int, *coros):
+    """asyncio.gather(), but with at most `limit` of the coroutines running at once.
+
+    Results come back in argument order, as with gather().
+    """
+    import asyncio
+
+    semaphore = asyncio.Semaphore(limit)
+
+    async def _bounded(coro):
+        async with semaphore:
+            return await coro
+
+    return await asyncio.gather(*(_bounded(coro) for coro in coros))
+
+
 def retry_camera_command(description: str, attempts: int = 2, delay: float = 2.0):
     """Decorator for sync camera-command helpers (run in the executor).
 
@@ -14,19 +14,20 @@ import pytest
 # This must happen at module level, before pytest collects tests
 # =============================================================================
 
-# Mock homeassistant core modules
-sys.modules["homeassistant"] = MagicMock()
-sys.modules["homeassistant.config_entries"] = MagicMock()
-sys.modules["homeassistant.core"] = MagicMock()
-sys.modules["homeassistant.const"] = MagicMock()
-sys.modules["homeassistant.helpers"] = MagicMock()
-sys.modules["homeassistant.helpers.entity"] = MagicMock()
-sys.modules["homeassistant.helpers.config_validation"] = MagicMock()
+# Mock homeassistant core modules. One MagicMock tree: each submodule entry is
+# the matching attribute of its parent, so `import homeassistant.core` and
+# `homeassistant.core` resolve to the same object. setdefault keeps a re-import
+# of this conftest from swapping in fresh mocks under already-imported modules.
+_ha = sys.modules.setdefault("homeassistant", MagicMock())
+sys.modules.setdefault("homeassistant.config_entries", _ha.config_entries)
+sys.modules.setdefault("homeassistant.core", _ha.core)
+sys.modules.setdefault("homeassistant.const", _ha.const)
+sys.modules.setdefault("homeassistant.helpers", _ha.helpers)
+sys.modules.setdefault("homeassistant.helpers.entity", _ha.helpers.entity)
+sys.modules.setdefault("homeassistant.helpers.config_validation", _ha.helpers.config_validation)
 
 # Mock cuboai utils to avoid file I/O during tests
-_mock_utils = MagicMock()
-_mock_utils.log_to_file = MagicMock()
-sys.modules["custom_components.cuboai.utils"] = _mock_utils
+sys.modules.setdefault("custom_components.cuboai.utils", MagicMock())
 
 
 # =============================================================================
@@ -42,6 +43,7 @@ sys.modules["custom_components.cuboai.utils"] = _mock_utils
 import inspect
 
 import aiohttp
+from aioresponses import aioresponses
 
 _resp_init = aiohttp.ClientResponse.__init__
 if "stream_writer" in inspect.signature(_resp_init).parameters:
@@ -62,15 +64,49 @@ if "stream_writer" in inspect.signature(_resp_init).parameters:
 
 
 @pytest.fixture
-def mock_cognito_client():
-    """Create a mock boto3 cognito-idp client."""
+def mocked():
+    """Active aioresponses mocker; register URLs on it, inspect .requests after."""
+    with aioresponses() as m:
+        yield m
+
+
+@pytest.fixture(scope="session")
+def awssrp_instance():
+    """One real pycognito AWSSRP for the whole run.
+
+    Construction generates the SRP private key and A = g^a mod N over a
+    3072-bit group, which is by far the slowest thing the auth tests do.
+    """
+    from pycognito import AWSSRP
+
+    return AWSSRP(
+        username="test@example.com",
+        password="testpassword",
+        pool_id="us-east-1_TestPool",
+        client_id="test-client-id",
+        client=MagicMock(),
+    )
+
+
+@pytest.fixture(scope="session")
+def awssrp_process_challenge_params():
+    """Parameter names of pycognito's AWSSRP.process_challenge, inspected once."""
+    from pycognito import AWSSRP
+
+    return list(inspect.signature(AWSSRP.process_challenge).parameters)
+
+
+@pytest.fixture
+def mock_cognito_client(mock_tokens):
+    """Create a mock boto3 cognito-idp client that answers challenges with mock_tokens."""
     client = MagicMock()
+    client.respond_to_auth_challenge.return_value = {"AuthenticationResult": mock_tokens}
     return client
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def mock_tokens():
-    """Standard token response from Cognito."""
+    """Standard token response from Cognito. Shared by every test; do not mutate."""
     return {
         "IdToken": "eyJhbGciOiJIUzI1NiIsInR5cCI6IkpXVCJ9.eyJzdWIiOiJ0ZXN0LXV1aWQtMTIzNCJ9.test",
         "AccessToken": "test-access-token-12345",
@@ -3,79 +3,122 @@
 These tests cover token storage, API calls, and utility functions.
 """
 
-import os
-import tempfile
-from unittest.mock import MagicMock, patch
+import base64
+import json
+from unittest.mock import patch
+
+import pytest
 
 # Import the actual functions from the cuboai module
 from custom_components.cuboai.api import cuboai_functions
 
 
+def _b64url(raw: bytes) -> str:
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+# Unsigned JWTs for TestDecodeIdToken (header.payload.signature). The
+# signature segment has to be valid base64url too: PyJWT rejects a bad
+# padding there even with verify_signature off.
+_JWT_HEADER = _b64url(b'{"alg":"HS256","typ":"JWT"}')
+_JWT_SIGNATURE = _b64url(b"fake-signature")
+_JWT_PAYLOAD_SUB = _b64url(b'{"sub":"user-uuid-12345"}')
+_JWT_PAYLOAD_NOSUB = _b64url(b'{"name":"test"}')
+_TOKEN_SUB = f"{_JWT_HEADER}.{_JWT_PAYLOAD_SUB}.{_JWT_SIGNATURE}"
+_TOKEN_NOSUB = f"{_JWT_HEADER}.{_JWT_PAYLOAD_NOSUB}.{_JWT_SIGNATURE}"
+
+
+@pytest.fixture(autouse=True)
+def _reset_token_paths(request):
+    """Start every test with no configured token paths, and restore them after.
+
+    TestSetTokenPaths is skipped: it configures the paths once for the whole
+    class through _configured_token_paths.
+    """
+    if request.cls is TestSetTokenPaths:
+        yield
+        return
+    orig_access, orig_refresh = cuboai_functions.ACCESS_TOKEN_FILE, cuboai_functions.REFRESH_TOKEN_FILE
+    cuboai_functions.ACCESS_TOKEN_FILE = None
+    cuboai_functions.REFRESH_TOKEN_FILE = None
+    yield
+    cuboai_functions.ACCESS_TOKEN_FILE, cuboai_functions.REFRESH_TOKEN_FILE = orig_access, orig_refresh
+
+
+@pytest.fixture
+def path_exists(monkeypatch):
+    """Answer os.path.exists from a predicate for the rest of the test."""
+
+    def _install(predicate):
+        monkeypatch.setattr(cuboai_functions.os.path, "exists", predicate)
+
+    return _install
+
+
+@pytest.fixture(scope="class")
+def _configured_token_paths():
+    """Replaces the module-level reset for TestSetTokenPaths: configure the paths once, restore them after."""
+    orig_access, orig_refresh = cuboai_functions.ACCESS_TOKEN_FILE, cuboai_functions.REFRESH_TOKEN_FILE
+    cuboai_functions.set_token_paths("/test/config")
+    yield
+    cuboai_functions.ACCESS_TOKEN_FILE, cuboai_functions.REFRESH_TOKEN_FILE = orig_access, orig_refresh
+
+
+@pytest.mark.usefixtures("_configured_token_paths")
 class TestSetTokenPaths:
     """Test token path configuration."""
 
     def test_sets_access_token_path(self):
         """set_token_paths should set ACCESS_TOKEN_FILE."""
-        cuboai_functions.set_token_paths("/test/config")
         assert "cuboai_access_token.json" in cuboai_functions.ACCESS_TOKEN_FILE
 
     def test_sets_refresh_token_path(self):
         """set_token_paths should set REFRESH_TOKEN_FILE."""
-        cuboai_functions.set_token_paths("/test/config")
         assert "cuboai_refresh_token.json" in cuboai_functions.REFRESH_TOKEN_FILE
 
     def test_handles_trailing_slash(self):
         """Should handle paths with or without trailing slash."""
         cuboai_functions.set_token_paths("/test/config/")
-        # os.path.join handles this correctly
-        assert "cuboai_access_token.json" in cuboai_functions.ACCESS_TOKEN_FILE
+        # os.path.join handles this correctly, so the class's paths are unchanged
+        assert cuboai_functions.ACCESS_TOKEN_FILE == "/test/config/cuboai_access_token.json"
 
 
 class TestGetAccessTokenPath:
     """Test access token path resolution with fallback."""
 
-    def setup_method(self):
-        """Reset token paths before each test."""
-        cuboai_functions.ACCESS_TOKEN_FILE = None
-        cuboai_functions.REFRESH_TOKEN_FILE = None
-
-    def test_returns_portable_path_when_exists(self):
+    def test_returns_portable_path_when_exists(self, path_exists):
         """When portable path exists, return it."""
         cuboai_functions.ACCESS_TOKEN_FILE = "/portable/path/token.json"
+        path_exists(lambda p: True)
 
-        with patch("os.path.exists") as mock_exists:
-            mock_exists.return_value = True
-            path = cuboai_functions._get_access_token_path()
+        path = cuboai_functions._get_access_token_path()
 
         assert path == "/portable/path/token.json"
 
-    def test_returns_legacy_path_when_portable_missing(self):
+    def test_returns_legacy_path_when_portable_missing(self, path_exists):
         """When portable doesn't exist but legacy does, return legacy."""
         cuboai_functions.ACCESS_TOKEN_FILE = "/portable/path/token.json"
+        path_exists(lambda p: p == cuboai_functions.LEGACY_ACCESS_TOKEN_FILE)
 
-        def mock_exists(p):
-            return p == cuboai_functions.LEGACY_ACCESS_TOKEN_FILE
-
-        with patch("os.path.exists", side_effect=mock_exists):
-            path = cuboai_functions._get_access_token_path()
+        path = cuboai_functions._get_access_token_path()
 
         assert path == cuboai_functions.LEGACY_ACCESS_TOKEN_FILE
 
-    def test_returns_portable_for_new_installation(self):
+    def test_returns_portable_for_new_installation(self, path_exists):
         """When neither exists, return portable path (for writing)."""
         cuboai_functions.ACCESS_TOKEN_FILE = "/portable/path/token.json"
+        path_exists(lambda p: False)
 
-        with patch("os.path.exists", return_value=False):
-            path = cuboai_functions._get_access_token_path()
+        path = cuboai_functions._get_access_token_path()
 
         assert path == "/portable/path/token.json"
 
-    def test_returns_legacy_when_no_portable_configured(self):
+    def test_returns_legacy_when_no_portable_configured(self, path_exists):
         """When ACCESS_TOKEN_FILE is None, return legacy."""
         cuboai_functions.ACCESS_TOKEN_FILE = None
+        path_exists(lambda p: False)
 
-        with patch("os.path.exists", return_value=False):
-            path = cuboai_functions._get_access_token_path()
+        path = cuboai_functions._get_access_token_path()
 
         assert path == cuboai_functions.LEGACY_ACCESS_TOKEN_FILE
 
@@ -83,76 +126,85 @@ class TestGetAccessTokenPath:
 class TestGetRefreshTokenPath:
     """Test refresh token path resolution with fallback."""
 
-    def setup_method(self):
-        """Reset token paths before each test."""
-        cuboai_functions.ACCESS_TOKEN_FILE = None
-        cuboai_functions.REFRESH_TOKEN_FILE = None
-
-    def test_returns_portable_path_when_exists(self):
+    def test_returns_portable_path_when_exists(self, path_exists):
         """When portable path exists, return it."""
         cuboai_functions.REFRESH_TOKEN_FILE = "/portable/path/refresh.json"
+        path_exists(lambda p: True)
 
-        with patch("os.path.exists") as mock_exists:
-            mock_exists.return_value = True
-            path = cuboai_functions._get_refresh_token_path()
+        path = cuboai_functions._get_refresh_token_path()
 
         assert path == "/portable/path/refresh.json"
 
-    def test_returns_legacy_when_portable_missing(self):
+    def test_returns_legacy_when_portable_missing(self, path_exists):
         """When portable doesn't exist but legacy does, return legacy."""
         cuboai_functions.REFRESH_TOKEN_FILE = "/portable/path/refresh.json"
+        path_exists(lambda p: p == cuboai_functions.LEGACY_REFRESH_TOKEN_FILE)
 
-        def mock_exists(p):
-            return p == cuboai_functions.LEGACY_REFRESH_TOKEN_FILE
-
-        with patch("os.path.exists", side_effect=mock_exists):
-            path = cuboai_functions._get_refresh_token_path()
+        path = cuboai_functions._get_refresh_token_path()
 
         assert path == cuboai_functions.LEGACY_REFRESH_TOKEN_FILE
 
 
+@pytest.fixture(scope="class")
+def token_dir(tmp_path_factory):
+    """One scratch directory shared by the save and load tests."""
+    return tmp_path_factory.mktemp("tokens")
+
+
 class TestTokenSaveLoad:
     """Test token save/load functions with real file I/O."""
 
-    def test_save_and_load_access_token(self):
-        """Should save and load access token correctly."""
-        with tempfile.TemporaryDirectory() as tmpdir:
-            token_path = os.path.join(tmpdir, "access_token.json")
-            cuboai_functions.ACCESS_TOKEN_FILE = token_path
+    def test_save_access_token_writes_json(self, token_dir):
+        """save_access_token should write {"access_token": ...} to the configured path."""
+        token_path = token_dir / "access_token.json"
+        cuboai_functions.ACCESS_TOKEN_FILE = str(token_path)
+
+        cuboai_functions.save_access_token("test-access-token-123")
+
+        assert json.loads(token_path.read_text(encoding="utf-8")) == {"access_token": "test-access-token-123"}
+
+    def test_load_access_token_reads_json(self, token_dir, path_exists):
+        """load_access_token should return the access_token field of the file."""
+        token_path = token_dir / "access_token_in.json"
+        token_path.write_text('{"access_token": "test-access-token-123"}', encoding="utf-8")
+        cuboai_functions.ACCESS_TOKEN_FILE = str(token_path)
+        path_exists(lambda p: True)
+
+        assert cuboai_functions.load_access_token() == "test-access-token-123"
 
-            with patch("os.path.exists", return_value=True):
-                cuboai_functions.save_access_token("test-access-token-123")
-                loaded = cuboai_functions.load_access_token()
+    def test_save_refresh_token_writes_json(self, token_dir):
+        """save_refresh_token should write {"refresh_token": ...} to the configured path."""
+        token_path = token_dir / "refresh_token.json"
+        cuboai_functions.REFRESH_TOKEN_FILE = str(token_path)
 
-            assert loaded == "test-access-token-123"
+        cuboai_functions.save_refresh_token("test-refresh-token-456")
 
-    def test_save_and_load_refresh_token(self):
-        """Should save and load refresh token correctly."""
-        with tempfile.TemporaryDirectory() as tmpdir:
-            token_path = os.path.join(tmpdir, "refresh_token.json")
-            cuboai_functions.REFRESH_TOKEN_FILE = token_path
+        assert json.loads(token_path.read_text(encoding="utf-8")) == {"refresh_token": "test-refresh-token-456"}
 
-            with patch("os.path.exists", return_value=True):
-                cuboai_functions.save_refresh_token("test-refresh-token-456")
-                loaded = cuboai_functions.load_refresh_token()
+    def test_load_refresh_token_reads_json(self, token_dir, path_exists):
+        """load_refresh_token should return the refresh_token field of the file."""
+        token_path = token_dir / "refresh_token_in.json"
+        token_path.write_text('{"refresh_token": "test-refresh-token-456"}', encoding="utf-8")
+        cuboai_functions.REFRESH_TOKEN_FILE = str(token_path)
+        path_exists(lambda p: True)
 
-            assert loaded == "test-refresh-token-456"
+        assert cuboai_functions.load_refresh_token() == "test-refresh-token-456"
 
-    def test_load_access_token_returns_none_on_missing_file(self):
+    def test_load_access_token_returns_none_on_missing_file(self, path_exists):
         """Should return None when token file doesn't exist."""
         cuboai_functions.ACCESS_TOKEN_FILE = "/nonexistent/path/token.json"
+        path_exists(lambda p: False)
 
-        with patch("os.path.exists", return_value=False):
-            result = cuboai_functions.load_access_token()
+        result = cuboai_functions.load_access_token()
 
         assert result is None
 
-    def test_load_refresh_token_returns_none_on_missing_file(self):
+    def test_load_refresh_token_returns_none_on_missing_file(self, path_exists):
         """Should return None when token file doesn't exist."""
         cuboai_functions.REFRESH_TOKEN_FILE = "/nonexistent/path/token.json"
+        path_exists(lambda p: False)
 
-        with patch("os.path.exists", return_value=False):
-            result = cuboai_functions.load_refresh_token()
+        result = cuboai_functions.load_refresh_token()
 
         assert result is None
 
@@ -162,154 +214,142 @@ class TestDecodeIdToken:
 
     def test_decodes_sub_claim(self):
         """Should decode the 'sub' claim from ID token."""
-        # Create a valid JWT structure (header.payload.signature)
-        # Payload: {"sub": "user-uuid-12345"}
-        import base64
-
-        header = base64.urlsafe_b64encode(b'{"alg":"HS256","typ":"JWT"}').decode().rstrip("=")
-        payload = base64.urlsafe_b64encode(b'{"sub":"user-uuid-12345"}').decode().rstrip("=")
-        token = f"{header}.{payload}.fake-signature"
-
-        result = cuboai_functions.decode_id_token(token)
-        assert result == "user-uuid-12345"
+        assert cuboai_functions.decode_id_token(_TOKEN_SUB) == "user-uuid-12345"
 
     def test_returns_none_for_missing_sub(self):
         """Should return None if 'sub' claim is missing."""
-        import base64
-
-        header = base64.urlsafe_b64encode(b'{"alg":"HS256","typ":"JWT"}').decode().rstrip("=")
-        payload = base64.urlsafe_b64encode(b'{"name":"test"}').decode().rstrip("=")
-        token = f"{header}.{payload}.fake-signature"
-
-        result = cuboai_functions.decode_id_token(token)
-        assert result is None
-
-
-class TestCuboMobileLogin:
-    """Test CuboAI mobile login API call."""
-
-    def test_sends_correct_request(self):
-        """Should send correct request to CuboAI API."""
-        with patch("custom_components.cuboai.api.cuboai_functions.requests.post") as mock_post:
-            mock_post.return_value.json.return_value = {"data": {"token": "result"}}
-            mock_post.return_value.raise_for_status = MagicMock()
-
-            result = cuboai_functions.cubo_mobile_login(
-                uuid="test-uuid",
-                username="test@example.com",
-                access_token="test-access-token",
-                user_agent="Test-Agent",
-            )
-
-            mock_post.assert_called_once()
-            call_args = mock_post.call_args
-            assert call_args[0][0] == "https://mobile-api.getcubo.com/v2/user/login"
-            assert "x-cb-authorization" in call_args[1]["headers"]
-
-    def test_returns_data_field(self):
-        """Should return the 'data' field from response."""
-        with patch("custom_components.cuboai.api.cuboai_functions.requests.post") as mock_post:
-            mock_post.return_value.json.return_value = {"data": {"access_token": "new-token"}}
-            mock_post.return_value.raise_for_status = MagicMock()
-
-            result = cuboai_functions.cubo_mobile_login(
-                uuid="test-uuid",
-                username="test@example.com",
-                access_token="test-access-token",
-                user_agent="Test-Agent",
-            )
-
-            assert result == {"access_token": "new-token"}
-
-
-class TestRefreshCuboToken:
-    """Test token refresh API call."""
-
-    def test_sends_refresh_token_in_header(self):
-        """Should send refresh token in x-refresh-authorization header."""
-        with patch("custom_components.cuboai.api.cuboai_functions.requests.post") as mock_post:
-            mock_post.return_value.json.return_value = {"data": {"access_token": "new"}}
-            mock_post.return_value.raise_for_status = MagicMock()
-
-            cuboai_functions.refresh_cubo_token("my-refresh-token", "Test-Agent")
-
-            call_args = mock_post.call_args
-            headers = call_args[1]["headers"]
-            assert headers["x-refresh-authorization"] == "Bearer my-refresh-token"
-
-    def test_returns_data_field_when_present(self):
-        """Should return 'data' field if present."""
-        with patch("custom_components.cuboai.api.cuboai_functions.requests.post") as mock_post:
-            mock_post.return_value.json.return_value = {"data": {"access_token": "new-token"}}
-            mock_post.return_value.raise_for_status = MagicMock()
-
-            result = cuboai_functions.refresh_cubo_token("refresh", "agent")
-
-            assert result == {"access_token": "new-token"}
-
-    def test_returns_full_response_when_no_data_field(self):
-        """Should return full response if no 'data' field."""
-        with patch("custom_components.cuboai.api.cuboai_functions.requests.post") as mock_post:
-            mock_post.return_value.json.return_value = {"access_token": "direct-token"}
-            mock_post.return_value.raise_for_status = MagicMock()
-
-            result = cuboai_functions.refresh_cubo_token("refresh", "agent")
-
-            assert result == {"access_token": "direct-token"}
-
-
-class TestGetCameraProfiles:
-    """Test camera profiles API call."""
-
-    def test_sends_correct_authorization(self):
-        """Should send access token in x-cspp-authorization header."""
-        with patch("custom_components.cuboai.api.cuboai_functions.requests.get") as mock_get:
-            mock_get.return_value.json.return_value = {"profiles": []}
-            mock_get.return_value.raise_for_status = MagicMock()
-
-            cuboai_functions.get_camera_profiles("my-access-token", "Test-Agent")
-
-            call_args = mock_get.call_args
-            headers = call_args[1]["headers"]
-            assert headers["x-cspp-authorization"] == "Bearer my-access-token"
-
-    def test_calls_correct_endpoint(self):
-        """Should call the cameras endpoint."""
-        with patch("custom_components.cuboai.api.cuboai_functions.requests.get") as mock_get:
-            mock_get.return_value.json.return_value = {"profiles": []}
-            mock_get.return_value.raise_for_status = MagicMock()
-
-            cuboai_functions.get_camera_profiles("token", "agent")
-
-            call_args = mock_get.call_args
-            assert call_args[0][0] == "https://api.getcubo.com/prod/user/cameras"
-
-
-class TestGetSubscriptionInfo:
-    """Test subscription info API call."""
-
-    def test_calls_correct_endpoint(self):
-        """Should call the subscription endpoint."""
-        with patch("custom_components.cuboai.api.cuboai_functions.requests.get") as mock_get:
-            mock_get.return_value.json.return_value = {"status": "active"}
-            mock_get.return_value.raise_for_status = MagicMock()
-
-            cuboai_functions.get_subscription_info("token", "agent")
-
-            call_args = mock_get.call_args
-            assert "subscribed" in call_args[0][0]
-
-
-class TestGetCameraState:
-    """Test camera state API call."""
-
-    def test_includes_device_id_in_request(self):
-        """Should include device_id in the request."""
-        with patch("custom_components.cuboai.api.cuboai_functions.requests.get") as mock_get:
-            mock_get.return_value.json.return_value = {"state": "online"}
-            mock_get.return_value.raise_for_status = MagicMock()
-
-            cuboai_functions.get_camera_state("device-123", "token", "agent")
-
-            call_args = mock_get.call_args
-            assert "device_id=device-123" in call_args[0][0]
+        assert cuboai_functions.decode_id_token(_TOKEN_NOSUB) is None
+
+
+class _FakeResp:
+    """Minimal stand-in for requests.Response: a fixed JSON body, always 2xx."""
+
+    def __init__(self, payload):
+        self._payload = payload
+
+    def json(self):
+        return self._payload
+
+    def raise_for_status(self):
+        pass
+
+
+@pytest.fixture
+def mock_requests():
+    """Patch requests.get and requests.post; yields (mock_get, mock_post)."""
+    with (
+        patch.object(cuboai_functions.requests, "get") as mock_get,
+        patch.object(cuboai_functions.requests, "post") as mock_post,
+    ):
+        yield mock_get, mock_post
+
+
+_LOGIN_ARGS = ("test-uuid", "test@example.com", "test-access-token", "Test-Agent")
+
+
+class TestRequestsApiCalls:
+    """Test the requests-based CuboAI API calls."""
+
+    @pytest.mark.parametrize(
+        ("fn", "args", "method", "url_part", "full_url", "header", "header_value"),
+        [
+            pytest.param(
+                cuboai_functions.cubo_mobile_login,
+                _LOGIN_ARGS,
+                "post",
+                "https://mobile-api.getcubo.com/v2/user/login",
+                True,
+                "x-cb-authorization",
+                "Bearer test-access-token",
+                id="mobile_login",
+            ),
+            pytest.param(
+                cuboai_functions.refresh_cubo_token,
+                ("my-refresh-token", "Test-Agent"),
+                "post",
+                "https://mobile-api.getcubo.com/v1/oauth/token",
+                True,
+                "x-refresh-authorization",
+                "Bearer my-refresh-token",
+                id="refresh_token",
+            ),
+            pytest.param(
+                cuboai_functions.get_camera_profiles,
+                ("my-access-token", "Test-Agent"),
+                "get",
+                "https://api.getcubo.com/prod/user/cameras",
+                True,
+                "x-cspp-authorization",
+                "Bearer my-access-token",
+                id="camera_profiles",
+            ),
+            pytest.param(
+                cuboai_functions.get_subscription_info,
+                ("token", "agent"),
+                "get",
+                "subscribed",
+                False,
+                "x-cspp-authorization",
+                "Bearer token",
+                id="subscription_info",
+            ),
+            pytest.param(
+                cuboai_functions.get_camera_state,
+                ("device-123", "token", "agent"),
+                "get",
+                "device_id=device-123",
+                False,
+                "x-cspp-authorization",
+                "Bearer token",
+                id="camera_state",
+            ),
+        ],
+    )
+    def test_sends_request(self, mock_requests, fn, args, method, url_part, full_url, header, header_value):
+        """Should call the right endpoint with the right auth header."""
+        mock_get, mock_post = mock_requests
+        mock_call = mock_post if method == "post" else mock_get
+        mock_call.return_value = _FakeResp({"data": {}})
+
+        fn(*args)
+
+        mock_call.assert_called_once()
+        call_args = mock_call.call_args
+        if full_url:
+            assert call_args[0][0] == url_part
+        else:
+            assert url_part in call_args[0][0]
+        assert call_args[1]["headers"][header] == header_value
+
+    @pytest.mark.parametrize(
+        ("fn", "args", "payload", "expected"),
+        [
+            pytest.param(
+                cuboai_functions.cubo_mobile_login,
+                _LOGIN_ARGS,
+                {"data": {"access_token": "new-token"}},
+                {"access_token": "new-token"},
+                id="mobile_login_data",
+            ),
+            pytest.param(
+                cuboai_functions.refresh_cubo_token,
+                ("refresh", "agent"),
+                {"data": {"access_token": "new-token"}},
+                {"access_token": "new-token"},
+                id="refresh_data",
+            ),
+            pytest.param(
+                cuboai_functions.refresh_cubo_token,
+                ("refresh", "agent"),
+                {"access_token": "direct-token"},
+                {"access_token": "direct-token"},
+                id="refresh_no_data",
+            ),
+        ],
+    )
+    def test_returns_response(self, mock_requests, fn, args, payload, expected):
+        """Should unwrap the 'data' field when present, else return the body."""
+        _, mock_post = mock_requests
+        mock_post.return_value = _FakeResp(payload)
+
+        assert fn(*args) == expected
@@ -3,363 +3,313 @@
 These tests cover the aiohttp-based async API calls.
 """
 
+import json
+import re
+
 import pytest
-from aioresponses import aioresponses
 
 # Import the async API functions
 from custom_components.cuboai.api import async_api
 
+# Alerts are fetched with a computed since= timestamp; match any value.
+_ALERTS_URL_RE = re.compile(r"^https://api\.getcubo\.com/prod/timeline/alerts\?since=\d+$")
+
+# /user/cameras response, pre-encoded. Each profile is itself a JSON string.
+_CAMERA_PROFILES_BODY = json.dumps(
+    {
+        "profiles": [
+            {"device_id": "device-123", "profile": '{"baby": "Emma"}'},
+            {"device_id": "device-456", "profile": '{"baby": "Liam"}'},
+        ]
+    }
+)
+
+# /timeline/alerts responses: one fully populated alert, and a page mixing the
+# requested camera's alert with another camera's.
+_ALERT_FULL = {
+    "id": "alert-1",
+    "device_id": "device-123",
+    "type": "cry",
+    "ts": 1700000000,
+    "created": "2024-01-01",
+    "image": "http://example.com/img.jpg",
+    "params": '{"level": "high"}',
+    "profile": "baby-profile",
+    "region": "us-east-1",
+}
+_ALERT_PAYLOAD_FULL = {"data": [_ALERT_FULL]}
+_ALERT_PAYLOAD_MIXED_DEVICES = {
+    "data": [
+        {"id": "alert-1", "device_id": "device-123", "ts": 1700000000},
+        {"id": "alert-2", "device_id": "other-device", "ts": 1700000001},
+    ]
+}
+
 
 class TestCuboMobileLoginAsync:
     """Test async cubo_mobile_login."""
 
-    @pytest.mark.asyncio
-    async def test_sends_correct_request(self):
+    async def test_sends_correct_request(self, mocked):
         """Test that login sends correct payload."""
-        with aioresponses() as m:
-            m.post(
-                "https://mobile-api.getcubo.com/v2/user/login",
-                payload={"data": {"token": "xyz"}},
-            )
-
-            result = await async_api.cubo_mobile_login(
-                uuid="test-uuid",
-                username="test@example.com",
-                access_token="test-token",
-                user_agent="TestAgent/1.0",
-            )
-
-            assert result == {"token": "xyz"}
-
-    @pytest.mark.asyncio
-    async def test_includes_authorization_header(self):
+        mocked.post(
+            "https://mobile-api.getcubo.com/v2/user/login",
+            payload={"data": {"token": "xyz"}},
+        )
+
+        result = await async_api.cubo_mobile_login(
+            uuid="test-uuid",
+            username="test@example.com",
+            access_token="test-token",
+            user_agent="TestAgent/1.0",
+        )
+
+        assert result == {"token": "xyz"}
+
+    async def test_includes_authorization_header(self, mocked):
         """Test that login includes x-cb-authorization header."""
-        with aioresponses() as m:
-            m.post(
-                "https://mobile-api.getcubo.com/v2/user/login",
-                payload={"data": {"success": True}},
-            )
+        mocked.post(
+            "https://mobile-api.getcubo.com/v2/user/login",
+            payload={"data": {"success": True}},
+        )
 
-            await async_api.cubo_mobile_login(
-                uuid="test-uuid",
-                username="test@example.com",
-                access_token="my-access-token",
-                user_agent="TestAgent/1.0",
-            )
+        await async_api.cubo_mobile_login(
+            uuid="test-uuid",
+            username="test@example.com",
+            access_token="my-access-token",
+            user_agent="TestAgent/1.0",
+        )
 
-            # Verify request was made
-            assert len(m.requests) == 1
+        # Verify request was made
+        assert len(mocked.requests) == 1
 
 
 class TestRefreshCuboTokenAsync:
     """Test async refresh_cubo_token."""
 
-    @pytest.mark.asyncio
-    async def test_sends_refresh_token_header(self):
+    async def test_sends_refresh_token_header(self, mocked):
         """Test that refresh sends token in header."""
-        with aioresponses() as m:
-            m.post(
-                "https://mobile-api.getcubo.com/v1/oauth/token",
-                payload={"data": {"access_token": "new-token"}},
-            )
+        mocked.post(
+            "https://mobile-api.getcubo.com/v1/oauth/token",
+            payload={"data": {"access_token": "new-token"}},
+        )
 
-            result = await async_api.refresh_cubo_token(
-                refresh_token="my-refresh-token",
-                user_agent="TestAgent/1.0",
-            )
+        result = await async_api.refresh_cubo_token(
+            refresh_token="my-refresh-token",
+            user_agent="TestAgent/1.0",
+        )
 
-            assert result == {"access_token": "new-token"}
+        assert result == {"access_token": "new-token"}
 
-    @pytest.mark.asyncio
-    async def test_returns_full_response_when_no_data(self):
+    async def test_returns_full_response_when_no_data(self, mocked):
         """Test returns full response when no data field."""
-        with aioresponses() as m:
-            m.post(
-                "https://mobile-api.getcubo.com/v1/oauth/token",
-                payload={"access_token": "direct-token"},
-            )
+        mocked.post(
+            "https://mobile-api.getcubo.com/v1/oauth/token",
+            payload={"access_token": "direct-token"},
+        )
 
-            result = await async_api.refresh_cubo_token(
-                refresh_token="my-refresh-token",
-                user_agent="TestAgent/1.0",
-            )
+        result = await async_api.refresh_cubo_token(
+            refresh_token="my-refresh-token",
+            user_agent="TestAgent/1.0",
+        )
 
-            assert result == {"access_token": "direct-token"}
+        assert result == {"access_token": "direct-token"}
 
 
 class TestGetCameraProfilesAsync:
     """Test async get_camera_profiles."""
 
-    @pytest.mark.asyncio
-    async def test_returns_device_map(self):
+    async def test_returns_device_map(self, mocked):
         """Test that camera profiles returns baby -> device_id mapping."""
-        import json
-
-        with aioresponses() as m:
-            m.get(
-                "https://api.getcubo.com/prod/user/cameras",
-                payload={
-                    "profiles": [
-                        {
-                            "device_id": "device-123",
-                            "profile": json.dumps({"baby": "Emma"}),
-                        },
-                        {
-                            "device_id": "device-456",
-                            "profile": json.dumps({"baby": "Liam"}),
-                        },
-                    ]
-                },
-            )
-            m.get(
-                "https://api.getcubo.com/prod/camera/state?device_id=device-123",
-                payload={"state": "online"},
-            )
-            m.get(
-                "https://api.getcubo.com/prod/camera/state?device_id=device-456",
-                payload={"state": "online"},
-            )
-
-            result = await async_api.get_camera_profiles(
-                access_token="test-token",
-                user_agent="TestAgent/1.0",
-            )
-
-            assert len(result) == 2
-            assert result[0]["device_id"] == "device-123"
-            assert result[0]["baby_name"] == "Emma"
-            assert result[1]["device_id"] == "device-456"
-            assert result[1]["baby_name"] == "Liam"
-
-    @pytest.mark.asyncio
-    async def test_handles_empty_profiles(self):
+        mocked.get(
+            "https://api.getcubo.com/prod/user/cameras",
+            body=_CAMERA_PROFILES_BODY,
+            content_type="application/json",
+        )
+        mocked.get(
+            "https://api.getcubo.com/prod/camera/state?device_id=device-123",
+            payload={"state": "online"},
+        )
+        mocked.get(
+            "https://api.getcubo.com/prod/camera/state?device_id=device-456",
+            payload={"state": "online"},
+        )
+
+        result = await async_api.get_camera_profiles(
+            access_token="test-token",
+            user_agent="TestAgent/1.0",
+        )
+
+        assert len(result) == 2
+        assert result[0]["device_id"] == "device-123"
+        assert result[0]["baby_name"] == "Emma"
+        assert result[1]["device_id"] == "device-456"
+        assert result[1]["baby_name"] == "Liam"
+
+    async def test_handles_empty_profiles(self, mocked):
         """Test handling of empty profiles list."""
-        with aioresponses() as m:
-            m.get(
-                "https://api.getcubo.com/prod/user/cameras",
-                payload={"profiles": []},
-            )
+        mocked.get(
+            "https://api.getcubo.com/prod/user/cameras",
+            payload={"profiles": []},
+        )
 
-            result = await async_api.get_camera_profiles(
-                access_token="test-token",
-                user_agent="TestAgent/1.0",
-            )
+        result = await async_api.get_camera_profiles(
+            access_token="test-token",
+            user_agent="TestAgent/1.0",
+        )
 
-            assert result == []
+        assert result == []
 
 
 class TestGetCameraProfilesRawAsync:
     """Test async get_camera_profiles_raw."""
 
-    @pytest.mark.asyncio
-    async def test_returns_raw_profiles(self):
+    async def test_returns_raw_profiles(self, mocked):
         """Test that raw profiles returns full profile list."""
         profiles = [
             {"device_id": "dev-1", "profile": '{"baby": "Test"}'},
             {"device_id": "dev-2", "profile": '{"baby": "Test2"}'},
         ]
-        with aioresponses() as m:
-            m.get(
-                "https://api.getcubo.com/prod/user/cameras",
-                payload={"profiles": profiles},
-            )
+        mocked.get(
+            "https://api.getcubo.com/prod/user/cameras",
+            payload={"profiles": profiles},
+        )
 
-            result = await async_api.get_camera_profiles_raw(
-                access_token="test-token",
-                user_agent="TestAgent/1.0",
-            )
+        result = await async_api.get_camera_profiles_raw(
+            access_token="test-token",
+            user_agent="TestAgent/1.0",
+        )
 
-            assert result == profiles
+        assert result == profiles
 
 
 class TestGetNAlertsPagedAsync:
     """Test async get_n_alerts_paged."""
 
-    @pytest.mark.asyncio
-    async def test_returns_normalized_alerts(self):
+    async def test_returns_normalized_alerts(self, mocked):
         """Test that alerts are normalized properly."""
-        import re
-
-        with aioresponses() as m:
-            # Use pattern to match URL with any since parameter
-            pattern = re.compile(r"^https://api\.getcubo\.com/prod/timeline/alerts\?since=\d+$")
-            m.get(
-                pattern,
-                payload={
-                    "data": [
-                        {
-                            "id": "alert-1",
-                            "device_id": "device-123",
-                            "type": "cry",
-                            "ts": 1700000000,
-                            "created": "2024-01-01",
-                            "image": "http://example.com/img.jpg",
-                            "params": '{"level": "high"}',
-                            "profile": "baby-profile",
-                            "region": "us-east-1",
-                        }
-                    ]
-                },
-                repeat=True,
-            )
-
-            result = await async_api.get_n_alerts_paged(
-                device_id="device-123",
-                access_token="test-token",
-                user_agent="TestAgent/1.0",
-                n=5,
-                hours_back=12,
-            )
-
-            assert len(result) == 1
-            assert result[0]["id"] == "alert-1"
-            assert result[0]["type"] == "cry"
-            assert result[0]["device_id"] == "device-123"
-
-    @pytest.mark.asyncio
-    async def test_filters_by_device_id(self):
+        mocked.get(
+            _ALERTS_URL_RE,
+            payload=_ALERT_PAYLOAD_FULL,
+        )
+
+        result = await async_api.get_n_alerts_paged(
+            device_id="device-123",
+            access_token="test-token",
+            user_agent="TestAgent/1.0",
+            n=5,
+            hours_back=12,
+        )
+
+        assert sum(len(calls) for calls in mocked.requests.values()) == 1
+        assert len(result) == 1
+        assert result[0]["id"] == "alert-1"
+        assert result[0]["type"] == "cry"
+        assert result[0]["device_id"] == "device-123"
+        # String params arrive decoded; the coordinator relies on this
+        assert result[0]["params"] == {"level": "high"}
+
+    async def test_filters_by_device_id(self, mocked):
         """Test that alerts are filtered by device_id."""
-        import re
-
-        with aioresponses() as m:
-            pattern = re.compile(r"^https://api\.getcubo\.com/prod/timeline/alerts\?since=\d+$")
-            m.get(
-                pattern,
-                payload={
-                    "data": [
-                        {"id": "alert-1", "device_id": "device-123", "ts": 1700000000},
-                        {"id": "alert-2", "device_id": "other-device", "ts": 1700000001},
-                    ]
-                },
-                repeat=True,
-            )
-
-            result = await async_api.get_n_alerts_paged(
-                device_id="device-123",
-                access_token="test-token",
-                user_agent="TestAgent/1.0",
-                n=5,
-                hours_back=12,
-            )
-
-            assert len(result) == 1
-            assert result[0]["device_id"] == "device-123"
+        mocked.get(
+            _ALERTS_URL_RE,
+            payload=_ALERT_PAYLOAD_MIXED_DEVICES,
+        )
+
+        result = await async_api.get_n_alerts_paged(
+            device_id="device-123",
+            access_token="test-token",
+            user_agent="TestAgent/1.0",
+            n=5,
+            hours_back=12,
+        )
+
+        assert sum(len(calls) for calls in mocked.requests.values()) == 1
+        assert len(result) == 1
+        assert result[0]["device_id"] == "device-123"
 
 
 class TestGetSubscriptionInfoAsync:
     """Test async get_subscription_info."""
 
-    @pytest.mark.asyncio
-    async def test_returns_subscription_data(self):
+    async def test_returns_subscription_data(self, mocked):
         """Test that subscription info is returned correctly."""
-        with aioresponses() as m:
-            m.get(
-                "https://api.getcubo.com/prod/services/v1/subscribed",
-                payload={
-                    "result": [
-                        {
-                            "status": "active",
-                            "kind": "premium",
-                            "service_id": "svc-123",
-                            "device_id": "dev-123",
-                            "platform": "android",
-                            "service_start_date": "2024-01-01",
-                            "service_end_date": "2025-01-01",
-                            "grace_period_stop_date": None,
-                            "auto_renewal": True,
-                            "note": None,
-                            "created": "2024-01-01",
-                            "order_id": "order-123",
-                        }
-                    ]
-                },
-            )
-
-            result = await async_api.get_subscription_info(
-                access_token="test-token",
-                user_agent="TestAgent/1.0",
-            )
-
-            assert result["status"] == "active"
-            assert result["kind"] == "premium"
-
-    @pytest.mark.asyncio
-    async def test_returns_none_for_empty_result(self):
+        mocked.get(
+            "https://api.getcubo.com/prod/services/v1/subscribed",
+            payload={
+                "result": [
+                    {
+                        "status": "active",
+                        "kind": "premium",
+                        "service_id": "svc-123",
+                        "device_id": "dev-123",
+                        "platform": "android",
+                        "service_start_date": "2024-01-01",
+                        "service_end_date": "2025-01-01",
+                        "grace_period_stop_date": None,
+                        "auto_renewal": True,
+                        "note": None,
+                        "created": "2024-01-01",
+                        "order_id": "order-123",
+                    }
+                ]
+            },
+        )
+
+        result = await async_api.get_subscription_info(
+            access_token="test-token",
+            user_agent="TestAgent/1.0",
+        )
+
+        assert result["status"] == "active"
+        assert result["kind"] == "premium"
+
+    async def test_returns_none_for_empty_result(self, mocked):
         """Test returns None when no subscription."""
-        with aioresponses() as m:
-            m.get(
-                "https://api.getcubo.com/prod/services/v1/subscribed",
-                payload={"result": []},
-            )
+        mocked.get(
+            "https://api.getcubo.com/prod/services/v1/subscribed",
+            payload={"result": []},
+        )
 
-            result = await async_api.get_subscription_info(
-                access_token="test-token",
-                user_agent="TestAgent/1.0",
-            )
+        result = await async_api.get_subscription_info(
+            access_token="test-token",
+            user_agent="TestAgent/1.0",
+        )
 
-            assert result is None
+        assert result is None
 
 
 class TestGetCameraStateAsync:
     """Test async get_camera_state."""
 
-    @pytest.mark.asyncio
-    async def test_returns_camera_state(self):
+    async def test_returns_camera_state(self, mocked):
         """Test that camera state is returned."""
-        with aioresponses() as m:
-            m.get(
-                "https://api.getcubo.com/prod/camera/state?device_id=device-123",
-                payload={"state": "online", "last_seen": 1700000000},
-            )
+        mocked.get(
+            "https://api.getcubo.com/prod/camera/state?device_id=device-123",
+            payload={"state": "online", "last_seen": 1700000000},
+        )
 
-            result = await async_api.get_camera_state(
-                device_id="device-123",
-                access_token="test-token",
-                user_agent="TestAgent/1.0",
-            )
+        result = await async_api.get_camera_state(
+            device_id="device-123",
+            access_token="test-token",
+            user_agent="TestAgent/1.0",
+        )
 
-            assert result["state"] == "online"
+        assert result["state"] == "online"
 
 
 class TestNormalizeAlert:
     """Test _normalize_alert helper."""
 
-    def test_normalizes_string_params(self):
-        """Test that string params are parsed as JSON."""
-        alert = {
-            "id": "alert-1",
-            "device_id": "dev-1",
-            "type": "cry",
-            "ts": 1700000000,
-            "created": "2024-01-01",
-            "image": "http://example.com/img.jpg",
-            "params": '{"level": "high"}',
-            "profile": "profile-1",
-            "region": "us-east-1",
-        }
-
-        result = async_api._normalize_alert(alert)
-
-        assert result["params"] == {"level": "high"}
-
-    def test_keeps_dict_params(self):
-        """Test that dict params stay as dict."""
-        alert = {
-            "id": "alert-1",
-            "params": {"level": "high"},
-        }
-
-        result = async_api._normalize_alert(alert)
-
-        assert result["params"] == {"level": "high"}
-
-    def test_handles_invalid_json_params(self):
-        """Test that invalid JSON params stay as string."""
-        alert = {
-            "id": "alert-1",
-            "params": "not-valid-json",
-        }
-
-        result = async_api._normalize_alert(alert)
-
-        assert result["params"] == "not-valid-json"
+    @pytest.mark.parametrize(
+        ("alert", "expected"),
+        [
+            pytest.param(_ALERT_FULL, {"level": "high"}, id="string_params_parsed"),
+            pytest.param({"id": "alert-1", "params": {"level": "high"}}, {"level": "high"}, id="dict_params_kept"),
+            pytest.param({"id": "alert-1", "params": "not-valid-json"}, "not-valid-json", id="invalid_json_kept"),
+            # Strict JSON: stdlib json would turn this into float("nan").
+            pytest.param({"id": "alert-1", "params": "NaN"}, "NaN", id="nan_kept_raw"),
+        ],
+    )
+    def test_normalize_alert_params(self, alert, expected):
+        """String params are parsed as JSON; dicts and invalid JSON pass through."""
+        assert async_api._normalize_alert(alert)["params"] == expected
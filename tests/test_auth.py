@@ -4,11 +4,17 @@ These tests import the actual cuboai functions (not copies) to ensure
 changes to the implementation are properly tested.
 """
 
+import base64
+import hashlib
+import hmac
 from unittest.mock import MagicMock, patch
 
+import pytest
+
 # Import actual functions from cuboai module
 # (conftest.py sets up the necessary mocks before this runs)
 from custom_components.cuboai.api.cuboai_functions import (
+    UnsupportedChallengeError,
     get_secret_hash,
     respond_to_mfa_challenge,
     respond_to_password_verifier,
@@ -32,13 +38,35 @@ class TestGetSecretHash:
 
     def test_hash_is_base64_encoded(self):
         """Hash should be a valid base64 string."""
-        import base64
-
         hash_value = get_secret_hash("user@test.com", "client123", "secret456")
         # Should not raise an exception
         decoded = base64.b64decode(hash_value)
         assert len(decoded) == 32  # SHA256 produces 32 bytes
 
+    def test_matches_reference_hmac(self):
+        """Must equal base64(HMAC-SHA256(secret, username + client_id)) as Cognito computes it."""
+        expected = base64.b64encode(hmac.new(b"secret456", b"user@test.comclient123", hashlib.sha256).digest()).decode()
+        assert get_secret_hash("user@test.com", "client123", "secret456") == expected
+
+    def test_shared_key_state_is_not_consumed(self):
+        """Successive users on the same client secret must each match a fresh HMAC."""
+        get_secret_hash.cache_clear()
+        for user in ("first@test.com", "second@test.com"):
+            expected = hmac.new(b"secret456", (user + "client123").encode(), hashlib.sha256).digest()
+            assert base64.b64decode(get_secret_hash(user, "client123", "secret456")) == expected
+
+    def test_caches_repeated_calls(self):
+        """Repeat calls with the same credentials should be served from the cache."""
+        get_secret_hash.cache_clear()
+        get_secret_hash("user@test.com", "client123", "secret456")
+        get_secret_hash("user@test.com", "client123", "secret456")
+        assert get_secret_hash.cache_info().hits >= 1
+
+    def test_sha256_is_openssl_backed(self):
+        """hashlib's sha256 should come from OpenSSL, not the builtin fallback."""
+        _hashlib = pytest.importorskip("_hashlib")
+        assert hashlib.sha256 is _hashlib.openssl_sha256
+
 
 class TestRespondToPasswordVerifier:
     """Tests for the respond_to_password_verifier function."""
@@ -51,8 +79,6 @@ class TestRespondToPasswordVerifier:
 
         mock_resp = {"ChallengeParameters": {"USER_ID_FOR_SRP": "testuser"}}
 
-        mock_cognito_client.respond_to_auth_challenge.return_value = {"AuthenticationResult": mock_tokens}
-
         # Call actual function
         result = respond_to_password_verifier(
             resp=mock_resp,
@@ -96,14 +122,18 @@ class TestRespondToPasswordVerifier:
         assert "username" in result
         assert result["username"] == "testuser"
 
-    def test_detects_software_token_mfa(self, mock_cognito_client, mock_software_token_mfa_challenge):
-        """Detects SOFTWARE_TOKEN_MFA (TOTP) challenge."""
+    @pytest.mark.parametrize("challenge_name", ["SMS_MFA", "SOFTWARE_TOKEN_MFA", "MFA_SETUP", "SELECT_MFA_TYPE"])
+    def test_detects_mfa_challenges(self, mock_cognito_client, mock_software_token_mfa_challenge, challenge_name):
+        """Detects every MFA challenge type, including SOFTWARE_TOKEN_MFA (TOTP)."""
         mock_aws = MagicMock()
         mock_aws.process_challenge.return_value = {"USERNAME": "testuser"}
 
         mock_resp = {"ChallengeParameters": {"USER_ID_FOR_SRP": "testuser"}}
 
-        mock_cognito_client.respond_to_auth_challenge.return_value = mock_software_token_mfa_challenge
+        mock_cognito_client.respond_to_auth_challenge.return_value = {
+            **mock_software_token_mfa_challenge,
+            "ChallengeName": challenge_name,
+        }
 
         result = respond_to_password_verifier(
             resp=mock_resp,
@@ -114,7 +144,39 @@ class TestRespondToPasswordVerifier:
             user_agent="test-agent",
         )
 
-        assert result["challenge"] == "SOFTWARE_TOKEN_MFA"
+        assert result["challenge"] == challenge_name
+
+    def test_rejects_non_mfa_challenge(self, mock_cognito_client, mock_software_token_mfa_challenge):
+        """A non-MFA challenge raises an error naming it instead of reaching the MFA step."""
+        mock_aws = MagicMock()
+        mock_aws.process_challenge.return_value = {"USERNAME": "testuser"}
+
+        mock_resp = {"ChallengeParameters": {"USER_ID_FOR_SRP": "testuser"}}
+
+        mock_cognito_client.respond_to_auth_challenge.return_value = {
+            **mock_software_token_mfa_challenge,
+            "ChallengeName": "NEW_PASSWORD_REQUIRED",
+        }
+
+        with pytest.raises(
+            UnsupportedChallengeError, match="Unsupported Cognito challenge: NEW_PASSWORD_REQUIRED"
+        ) as exc:
+            respond_to_password_verifier(
+                resp=mock_resp,
+                aws=mock_aws,
+                client=mock_cognito_client,
+                client_id="test-client-id",
+                client_secret="test-client-secret",
+                user_agent="test-agent",
+            )
+        assert exc.value.challenge == "NEW_PASSWORD_REQUIRED"
+
+
+@pytest.fixture(scope="class")
+def _patched_boto_client():
+    """Keep boto3.client patched for the whole of TestRespondToMfaChallenge."""
+    with patch("custom_components.cuboai.api.cuboai_functions.boto3.client") as client_factory:
+        yield client_factory
 
 
 class TestRespondToMfaChallenge:
@@ -124,130 +186,68 @@ class TestRespondToMfaChallenge:
     client internally, so we need to patch boto3.client to test it.
     """
 
-    @patch("custom_components.cuboai.api.cuboai_functions.boto3.client")
-    def test_sms_mfa_success(self, mock_boto_client, mock_tokens):
-        """Successfully responds to SMS MFA challenge."""
-        mock_client = MagicMock()
-        mock_client.respond_to_auth_challenge.return_value = {"AuthenticationResult": mock_tokens}
-        mock_boto_client.return_value = mock_client
+    @pytest.fixture
+    def mock_boto_client(self, _patched_boto_client, mock_cognito_client):
+        """The patched boto3.client, reset per test and returning mock_cognito_client."""
+        _patched_boto_client.reset_mock()
+        _patched_boto_client.return_value = mock_cognito_client
+        return _patched_boto_client
+
+    @pytest.mark.parametrize("region", [None, "eu-west-1"], ids=["default_region", "eu_west_1"])
+    @pytest.mark.parametrize(
+        ("challenge_kwargs", "mfa_code", "expected_name", "expected_key"),
+        [
+            pytest.param({"challenge_name": "SMS_MFA"}, "123456", "SMS_MFA", "SMS_MFA_CODE", id="sms"),
+            pytest.param(
+                {"challenge_name": "SOFTWARE_TOKEN_MFA"},
+                "654321",
+                "SOFTWARE_TOKEN_MFA",
+                "SOFTWARE_TOKEN_MFA_CODE",
+                id="totp",
+            ),
+            # No challenge_name specified - should default to SMS_MFA
+            pytest.param({}, "123456", "SMS_MFA", "SMS_MFA_CODE", id="default_is_sms"),
+        ],
+    )
+    def test_respond_to_mfa_challenge(
+        self,
+        mock_boto_client,
+        mock_cognito_client,
+        mock_tokens,
+        challenge_kwargs,
+        mfa_code,
+        expected_name,
+        expected_key,
+        region,
+    ):
+        """Sends the right challenge, code key, session and credentials, and returns the tokens."""
+        region_kwargs = {"region": region} if region else {}
 
         result = respond_to_mfa_challenge(
             client_id="test-client-id",
             client_secret="test-client-secret",
-            session="test-session",
+            session="my-unique-session-token",
             username="testuser",
-            mfa_code="123456",
-            challenge_name="SMS_MFA",
+            mfa_code=mfa_code,
+            **challenge_kwargs,
+            **region_kwargs,
         )
 
         # Verify tokens returned
         assert result == mock_tokens
 
-        # Verify correct challenge response was sent
-        call_args = mock_client.respond_to_auth_challenge.call_args
-        assert call_args.kwargs["ChallengeName"] == "SMS_MFA"
-        assert "SMS_MFA_CODE" in call_args.kwargs["ChallengeResponses"]
-        assert call_args.kwargs["ChallengeResponses"]["SMS_MFA_CODE"] == "123456"
-
-    @patch("custom_components.cuboai.api.cuboai_functions.boto3.client")
-    def test_software_token_mfa_success(self, mock_boto_client, mock_tokens):
-        """Successfully responds to SOFTWARE_TOKEN_MFA (TOTP) challenge."""
-        mock_client = MagicMock()
-        mock_client.respond_to_auth_challenge.return_value = {"AuthenticationResult": mock_tokens}
-        mock_boto_client.return_value = mock_client
-
-        result = respond_to_mfa_challenge(
-            client_id="test-client-id",
-            client_secret="test-client-secret",
-            session="test-session",
-            username="testuser",
-            mfa_code="654321",
-            challenge_name="SOFTWARE_TOKEN_MFA",
-        )
-
-        # Verify correct response key for TOTP
-        call_args = mock_client.respond_to_auth_challenge.call_args
-        assert call_args.kwargs["ChallengeName"] == "SOFTWARE_TOKEN_MFA"
-        assert "SOFTWARE_TOKEN_MFA_CODE" in call_args.kwargs["ChallengeResponses"]
-        assert call_args.kwargs["ChallengeResponses"]["SOFTWARE_TOKEN_MFA_CODE"] == "654321"
-
-    @patch("custom_components.cuboai.api.cuboai_functions.boto3.client")
-    def test_default_challenge_name_is_sms(self, mock_boto_client, mock_tokens):
-        """Default MFA type is SMS_MFA."""
-        mock_client = MagicMock()
-        mock_client.respond_to_auth_challenge.return_value = {"AuthenticationResult": mock_tokens}
-        mock_boto_client.return_value = mock_client
-
-        respond_to_mfa_challenge(
-            client_id="test-client-id",
-            client_secret="test-client-secret",
-            session="test-session",
-            username="testuser",
-            mfa_code="123456",
-            # No challenge_name specified - should default to SMS_MFA
-        )
-
-        call_args = mock_client.respond_to_auth_challenge.call_args
-        assert call_args.kwargs["ChallengeName"] == "SMS_MFA"
-
-    @patch("custom_components.cuboai.api.cuboai_functions.boto3.client")
-    def test_includes_secret_hash_and_username(self, mock_boto_client, mock_tokens):
-        """Challenge response includes required SECRET_HASH and USERNAME."""
-        mock_client = MagicMock()
-        mock_client.respond_to_auth_challenge.return_value = {"AuthenticationResult": mock_tokens}
-        mock_boto_client.return_value = mock_client
+        # Boto3 client is created with the specified (or default) region
+        mock_boto_client.assert_called_once_with("cognito-idp", region_name=region or "us-east-1")
 
-        respond_to_mfa_challenge(
-            client_id="test-client-id",
-            client_secret="test-client-secret",
-            session="test-session",
-            username="testuser",
-            mfa_code="123456",
-        )
-
-        call_args = mock_client.respond_to_auth_challenge.call_args
-        challenge_responses = call_args.kwargs["ChallengeResponses"]
-
-        assert "USERNAME" in challenge_responses
+        # Verify correct challenge response was sent
+        kwargs = mock_cognito_client.respond_to_auth_challenge.call_args.kwargs
+        assert kwargs["ChallengeName"] == expected_name
+        assert kwargs["Session"] == "my-unique-session-token"
+        challenge_responses = kwargs["ChallengeResponses"]
+        assert challenge_responses[expected_key] == mfa_code
         assert challenge_responses["USERNAME"] == "testuser"
         assert "SECRET_HASH" in challenge_responses
 
-    @patch("custom_components.cuboai.api.cuboai_functions.boto3.client")
-    def test_passes_session_to_cognito(self, mock_boto_client, mock_tokens):
-        """Session token is passed to Cognito."""
-        mock_client = MagicMock()
-        mock_client.respond_to_auth_challenge.return_value = {"AuthenticationResult": mock_tokens}
-        mock_boto_client.return_value = mock_client
-
-        respond_to_mfa_challenge(
-            client_id="test-client-id",
-            client_secret="test-client-secret",
-            session="my-unique-session-token",
-            username="testuser",
-            mfa_code="123456",
-        )
-
-        call_args = mock_client.respond_to_auth_challenge.call_args
-        assert call_args.kwargs["Session"] == "my-unique-session-token"
-
-    @patch("custom_components.cuboai.api.cuboai_functions.boto3.client")
-    def test_creates_cognito_client_with_correct_region(self, mock_boto_client, mock_tokens):
-        """Boto3 client is created with the specified region."""
-        mock_client = MagicMock()
-        mock_client.respond_to_auth_challenge.return_value = {"AuthenticationResult": mock_tokens}
-        mock_boto_client.return_value = mock_client
-
-        respond_to_mfa_challenge(
-            client_id="test-client-id",
-            client_secret="test-client-secret",
-            session="test-session",
-            username="testuser",
-            mfa_code="123456",
-            region="eu-west-1",
-        )
-
-        mock_boto_client.assert_called_once_with("cognito-idp", region_name="eu-west-1")
-
 
 class TestPycognitoCompatibility:
     """Tests to verify compatibility with the pycognito library.
@@ -256,18 +256,13 @@ class TestPycognitoCompatibility:
     by testing against the actual library (not mocked).
     """
 
-    def test_awssrp_process_challenge_signature(self):
+    def test_awssrp_process_challenge_signature(self, awssrp_process_challenge_params):
         """Verify AWSSRP.process_challenge accepts required parameters.
 
         This test ensures we're compatible with pycognito's API.
         If pycognito changes their signature again, this test will fail.
         """
-        import inspect
-
-        from pycognito import AWSSRP
-
-        sig = inspect.signature(AWSSRP.process_challenge)
-        params = list(sig.parameters.keys())
+        params = awssrp_process_challenge_params
 
         # Should have: self, challenge_parameters, request_parameters
         assert "challenge_parameters" in params or len(params) >= 2, (
@@ -278,42 +273,14 @@ class TestPycognitoCompatibility:
             f"AWSSRP.process_challenge should accept request_parameters. Got: {params}"
         )
 
-    def test_awssrp_can_be_instantiated(self):
+    def test_awssrp_can_be_instantiated(self, awssrp_instance):
         """Verify AWSSRP can be instantiated with expected parameters."""
-        from unittest.mock import MagicMock
-
-        from pycognito import AWSSRP
+        assert awssrp_instance is not None
+        assert awssrp_instance.username == "test@example.com"
 
-        mock_client = MagicMock()
-
-        # This should not raise an exception
-        aws = AWSSRP(
-            username="test@example.com",
-            password="testpassword",
-            pool_id="us-east-1_TestPool",
-            client_id="test-client-id",
-            client=mock_client,
-        )
-
-        assert aws is not None
-        assert aws.username == "test@example.com"
-
-    def test_awssrp_get_auth_params_returns_expected_keys(self):
+    def test_awssrp_get_auth_params_returns_expected_keys(self, awssrp_instance):
         """Verify get_auth_params returns expected structure."""
-        from unittest.mock import MagicMock
-
-        from pycognito import AWSSRP
-
-        mock_client = MagicMock()
-        aws = AWSSRP(
-            username="test@example.com",
-            password="testpassword",
-            pool_id="us-east-1_TestPool",
-            client_id="test-client-id",
-            client=mock_client,
-        )
-
-        auth_params = aws.get_auth_params()
+        auth_params = awssrp_instance.get_auth_params()
 
         assert "USERNAME" in auth_params, "auth_params should contain USERNAME"
         assert "SRP_A" in auth_params, "auth_params should contain SRP_A"
@@ -1,5 +1,21 @@
 """Tests for config flow multi-camera support."""
 
+import importlib.util
+import logging
+import sys
+import types
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+REPO = Path(__file__).resolve().parents[1]
+
+
+def _cameras_from_map(camera_map):
+    """Convert a {baby_name: device_id} map to the stored cameras list."""
+    return [{"device_id": device_id, "baby_name": baby_name} for baby_name, device_id in camera_map.items()]
+
 
 def test_entry_title_format():
     """Test that entry title includes username."""
@@ -19,9 +35,7 @@ def test_cameras_data_structure():
     }
 
     # Convert to list format
-    cameras = []
-    for baby_name, device_id in camera_map.items():
-        cameras.append({"device_id": device_id, "baby_name": baby_name})
+    cameras = _cameras_from_map(camera_map)
 
     assert len(cameras) == 3
     assert all("device_id" in cam and "baby_name" in cam for cam in cameras)
@@ -37,9 +51,7 @@ def test_single_camera_entry():
     """Test single camera creates valid structure."""
     camera_map = {"Emma": "device-001"}
 
-    cameras = []
-    for baby_name, device_id in camera_map.items():
-        cameras.append({"device_id": device_id, "baby_name": baby_name})
+    cameras = _cameras_from_map(camera_map)
 
     assert len(cameras) == 1
     assert cameras[0]["device_id"] == "device-001"
@@ -62,13 +74,13 @@ def test_mfa_flow_camera_storage():
         "Noah": "device-002",
     }
 
-    cameras_normal = [{"device_id": device_id, "baby_name": baby_name} for baby_name, device_id in camera_map.items()]
-
-    cameras_mfa = [{"device_id": device_id, "baby_name": baby_name} for baby_name, device_id in camera_map.items()]
+    # Both flows finish through the same helper, so one conversion serves both
+    cameras = _cameras_from_map(camera_map)
 
-    # Both should be identical
-    assert len(cameras_normal) == len(cameras_mfa)
-    assert all(c in cameras_mfa for c in cameras_normal)
+    assert cameras == [
+        {"device_id": "device-001", "baby_name": "Emma"},
+        {"device_id": "device-002", "baby_name": "Noah"},
+    ]
 
 
 def test_entry_data_has_required_fields():
@@ -107,3 +119,109 @@ def test_cameras_list_format():
         assert isinstance(camera, dict)
         assert "device_id" in camera
         assert "baby_name" in camera
+
+
+# ── the shared login completion step ──────────────────────────────────────
+
+
+def _make_flow(monkeypatch, cameras):
+    """Build CuboAIConfigFlow against a minimal ConfigFlow stub, with the sync api mocked."""
+    config_entries = types.ModuleType("homeassistant.config_entries")
+
+    class _ConfigFlow:
+        def __init_subclass__(cls, domain=None, **kwargs):
+            super().__init_subclass__(**kwargs)
+
+        def async_show_form(self, **kwargs):
+            return {"type": "form", **kwargs}
+
+    config_entries.ConfigFlow = _ConfigFlow
+    config_entries.OptionsFlow = object
+    core = types.ModuleType("homeassistant.core")
+    core.callback = lambda fn: fn
+    ha = types.ModuleType("homeassistant")
+    ha.config_entries = config_entries
+    ha.core = core
+    pkg = types.ModuleType("cuboai_pkg")
+    pkg.__path__ = [str(REPO / "custom_components" / "cuboai")]
+    for name, mod in (
+        ("homeassistant", ha),
+        ("homeassistant.config_entries", config_entries),
+        ("homeassistant.core", core),
+        ("cuboai_pkg", pkg),
+    ):
+        monkeypatch.setitem(sys.modules, name, mod)
+
+    spec = importlib.util.spec_from_file_location(
+        "cuboai_pkg.config_flow", REPO / "custom_components" / "cuboai" / "config_flow.py"
+    )
+    module = importlib.util.module_from_spec(spec)
+    monkeypatch.setitem(sys.modules, "cuboai_pkg.config_flow", module)
+    spec.loader.exec_module(module)
+
+    api = MagicMock()
+    api.UnsupportedChallengeError = module.api.UnsupportedChallengeError
+    api.decode_id_token.return_value = "uuid-1"
+    api.cubo_mobile_login.return_value = {"access_token": "access-token", "refresh_token": "refresh-token"}
+    api.get_camera_profiles.return_value = cameras
+    monkeypatch.setattr(module, "api", api)
+
+    async def _run_in_executor(fn, *args):
+        return fn(*args)
+
+    flow = module.CuboAIConfigFlow()
+    flow.hass = types.SimpleNamespace(async_add_executor_job=_run_in_executor)
+    flow.async_step_select_cameras = AsyncMock(return_value={"type": "form", "step_id": "select_cameras"})
+    return module, flow, api
+
+
+_TOKENS = {"IdToken": "id-token", "AccessToken": "cognito-access"}
+
+
+@pytest.mark.parametrize("step_id", ["user", "mfa"])
+async def test_finish_login_without_cameras_reshows_calling_step(monkeypatch, step_id):
+    module, flow, _ = _make_flow(monkeypatch, cameras=[])
+    schema = module.AUTH_SCHEMA if step_id == "user" else module.MFA_SCHEMA
+
+    result = await flow._async_finish_login(_TOKENS, "user@example.com", "agent", step_id, schema)
+
+    assert result == {"type": "form", "step_id": step_id, "data_schema": schema, "errors": {"base": "no_cameras"}}
+    flow.async_step_select_cameras.assert_not_awaited()
+
+
+async def test_finish_login_with_cameras_stores_auth_data(monkeypatch, caplog):
+    cameras = [{"device_id": "device-001", "baby_name": "Emma"}]
+    module, flow, api = _make_flow(monkeypatch, cameras=cameras)
+    caplog.set_level(logging.DEBUG, logger="cuboai_pkg.config_flow")
+
+    result = await flow._async_finish_login(_TOKENS, "user@example.com", "agent", "mfa", module.MFA_SCHEMA)
+
+    assert result["step_id"] == "select_cameras"
+    api.cubo_mobile_login.assert_called_once_with("uuid-1", "user@example.com", "cognito-access", "agent")
+    api.get_camera_profiles.assert_called_once_with("access-token", "agent")
+    assert flow._auth_data == {
+        "uuid": "uuid-1",
+        "username": "user@example.com",
+        "client_id": module.CLIENT_ID,
+        "client_secret": module.CLIENT_SECRET,
+        "pool_id": module.POOL_ID,
+        "region": module.REGION,
+        "access_token": "access-token",
+        "refresh_token": "refresh-token",
+        "user_agent": "agent",
+        "cameras": cameras,
+    }
+    assert "Cubo mobile login successful (mfa step)" in caplog.text
+
+
+async def test_unsupported_challenge_gets_its_own_error(monkeypatch):
+    """A correct password that hits NEW_PASSWORD_REQUIRED must not read as bad credentials."""
+    _, flow, api = _make_flow(monkeypatch, cameras=[])
+    api.initiate_user_srp_auth.return_value = ({}, MagicMock(), MagicMock(), {})
+    api.respond_to_password_verifier.side_effect = api.UnsupportedChallengeError("NEW_PASSWORD_REQUIRED")
+
+    result = await flow.async_step_user({"username": "user@example.com", "password": "correct"})
+
+    assert result["step_id"] == "user"
+    assert result["errors"] == {"base": "unsupported_challenge"}
+    api.cubo_mobile_login.assert_not_called()
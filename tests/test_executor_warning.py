@@ -0,0 +1,46 @@
+"""Tests for the startup warning about a small default executor."""
+
+import logging
+import types
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from custom_components.cuboai import _MIN_EXECUTOR_WORKERS, _warn_if_executor_small
+
+
+def _hass_with_loop(loop):
+    return types.SimpleNamespace(loop=loop)
+
+
+@pytest.mark.parametrize(
+    ("workers", "warns"),
+    [
+        pytest.param(_MIN_EXECUTOR_WORKERS - 1, True, id="below_minimum"),
+        pytest.param(_MIN_EXECUTOR_WORKERS, False, id="at_minimum"),
+        pytest.param(_MIN_EXECUTOR_WORKERS * 2, False, id="above_minimum"),
+    ],
+)
+def test_warns_only_below_minimum(caplog, workers, warns):
+    executor = ThreadPoolExecutor(max_workers=workers)
+    try:
+        with caplog.at_level(logging.WARNING, logger="custom_components.cuboai"):
+            _warn_if_executor_small(_hass_with_loop(types.SimpleNamespace(_default_executor=executor)))
+    finally:
+        executor.shutdown()
+
+    assert ("worker threads" in caplog.text) is warns
+
+
+@pytest.mark.parametrize(
+    "loop",
+    [
+        pytest.param(types.SimpleNamespace(), id="no_default_executor"),
+        pytest.param(types.SimpleNamespace(_default_executor=None), id="executor_not_created_yet"),
+    ],
+)
+def test_quiet_when_executor_unknown(caplog, loop):
+    with caplog.at_level(logging.WARNING, logger="custom_components.cuboai"):
+        _warn_if_executor_small(_hass_with_loop(loop))
+
+    assert caplog.text == ""
@@ -0,0 +1,61 @@
+"""Tests for utils.gather_with_concurrency.
+
+conftest.py replaces custom_components.cuboai.utils with a MagicMock, so the
+real function is pulled out of the source and run on its own.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import types
+from pathlib import Path
+
+REPO = Path(__file__).resolve().parent.parent
+
+
+def _load_gather_with_concurrency():
+    """Pull gather_with_concurrency out of utils.py past the conftest stub."""
+    src = (REPO / "custom_components" / "cuboai" / "utils.py").read_text(encoding="utf-8")
+    start = src.index("async def gather_with_concurrency")
+    end = src.index("def retry_camera_command")
+    module = types.ModuleType("utils_extract")
+    exec(compile(src[start:end], "utils_extract", "exec"), module.__dict__)
+    return module.gather_with_concurrency
+
+
+gather_with_concurrency = _load_gather_with_concurrency()
+
+
+async def test_results_come_back_in_argument_order():
+    async def _value_after(value, delay):
+        await asyncio.sleep(delay)
+        return value
+
+    # Later arguments finish first.
+    coros = [_value_after(i, 0.005 * (4 - i)) for i in range(5)]
+
+    assert await gather_with_concurrency(2, *coros) == [0, 1, 2, 3, 4]
+
+
+async def test_at_most_limit_run_at_once():
+    release = asyncio.Event()
+    running = 0
+    peak = 0
+
+    async def _hold(value):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await release.wait()
+        running -= 1
+        return value
+
+    task = asyncio.ensure_future(gather_with_concurrency(2, *(_hold(i) for i in range(6))))
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+    # Only `limit` coroutines got past the semaphore; the rest are queued.
+    assert running == 2
+    release.set()
+    assert await task == list(range(6))
+    assert peak == 2
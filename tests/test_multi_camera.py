@@ -200,22 +200,13 @@ def test_backward_compat_device_info_lookup():
 
     device_id = "device-001"
 
-    # New format lookup
-    cameras = new_entry_data.get("cameras", [])
-    baby_name = "Unknown"
-    for cam in cameras:
-        if cam["device_id"] == device_id:
-            baby_name = cam["baby_name"]
-            break
-    assert baby_name == "Emma"
+    # New format lookup: index the cameras by device_id once, then O(1) gets
+    index = {cam["device_id"]: cam["baby_name"] for cam in new_entry_data.get("cameras", [])}
+    assert index.get(device_id, "Unknown") == "Emma"
 
     # Old format fallback
-    baby_name = "Unknown"
-    cameras = old_entry_data.get("cameras", [])
-    for cam in cameras:
-        if cam["device_id"] == device_id:
-            baby_name = cam["baby_name"]
-            break
+    index = {cam["device_id"]: cam["baby_name"] for cam in old_entry_data.get("cameras", [])}
+    baby_name = index.get(device_id, "Unknown")
     if baby_name == "Unknown" and old_entry_data.get("device_id") == device_id:
         baby_name = old_entry_data.get("baby_name", "Unknown")
     assert baby_name == "Emma"
@@ -0,0 +1,251 @@
+"""Tests for the backed-off cloud queries in the coordinator.
+
+Subscription status and the cloud camera state change rarely, so the
+coordinator stops re-asking for them on every poll while the answer stays
+the same. The contract locked down here:
+
+- An unchanged answer doubles the wait, up to the 15-minute cap.
+- A changed answer, or a reset, goes straight back to the base interval.
+- A failed query is never recorded, so the next poll retries it.
+
+The same coordinator harness also covers the bounded alert-image downloads
+in _fetch_all.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import datetime as dt
+import importlib.util
+import sys
+import types
+from pathlib import Path
+from unittest.mock import AsyncMock
+
+REPO = Path(__file__).resolve().parent.parent
+
+
+def _load_backoff():
+    """Pull _PollBackoff out of coordinator.py without importing Home Assistant."""
+    src = (REPO / "custom_components" / "cuboai" / "coordinator.py").read_text(encoding="utf-8")
+    start = src.index("#: Longest a backed-off cloud query")
+    end = src.index("async def _cached")
+    module = types.ModuleType("backoff_extract")
+    module.timedelta = dt.timedelta
+    exec(compile(src[start:end], "coordinator_extract", "exec"), module.__dict__)
+    return module._PollBackoff
+
+
+def _backoff(base_s=60):
+    return _load_backoff()(dt.timedelta(seconds=base_s))
+
+
+def test_first_poll_is_always_due():
+    assert _backoff().due(0.0)
+
+
+def test_unchanged_answer_doubles_the_wait():
+    b = _backoff()
+    b.record({"state": "online"}, 0.0)
+    assert not b.due(30.0)
+    assert b.due(60.0)
+
+    b.record({"state": "online"}, 60.0)
+    assert not b.due(60.0 + 90.0)
+    assert b.due(60.0 + 120.0)
+
+
+def test_wait_is_capped_at_fifteen_minutes():
+    b = _backoff()
+    now = 0.0
+    for _ in range(12):
+        b.record({"status": "active"}, now)
+        now += 10_000.0
+    b.record({"status": "active"}, now)
+    assert not b.due(now + 800.0)
+    assert b.due(now + 900.0)
+
+
+def test_changed_answer_resets_to_base_interval():
+    b = _backoff()
+    for now in (0.0, 60.0, 180.0, 420.0):
+        b.record({"state": "online"}, now)
+    b.record({"state": "offline"}, 900.0)
+    assert b.due(960.0)
+    assert b.last == {"state": "offline"}
+
+
+def test_reset_makes_the_next_poll_due():
+    b = _backoff()
+    b.record({"state": "online"}, 0.0)
+    b.record({"state": "online"}, 60.0)
+    assert not b.due(61.0)
+    b.reset()
+    assert b.due(61.0)
+
+
+def test_none_is_a_real_answer():
+    # "No subscription" comes back as None and must be cached like any other
+    # answer, not treated as "never fetched".
+    b = _backoff()
+    b.record(None, 0.0)
+    assert not b.due(1.0)
+    assert b.last is None
+
+
+# ── the coordinator actually skipping not-due queries ─────────────────────
+
+
+def _load_coordinator(monkeypatch):
+    """Import coordinator.py against minimal HA stubs (the history-sensor test pattern)."""
+    upd = types.ModuleType("homeassistant.helpers.update_coordinator")
+
+    class _DataUpdateCoordinator:
+        def __init__(self, hass, logger, name, update_interval):
+            self.hass = hass
+            self.update_interval = update_interval
+            self.data = None
+
+    upd.DataUpdateCoordinator = _DataUpdateCoordinator
+    upd.UpdateFailed = type("UpdateFailed", (Exception,), {})
+    util = types.ModuleType("homeassistant.util")
+    util_dt = types.ModuleType("homeassistant.util.dt")
+    util_dt.utcnow = lambda: dt.datetime(2026, 1, 1, tzinfo=dt.UTC)
+    util.dt = util_dt
+    pkg = types.ModuleType("cuboai_pkg")
+    pkg.__path__ = [str(REPO / "custom_components" / "cuboai")]
+    for name, mod in (
+        ("homeassistant.helpers.update_coordinator", upd),
+        ("homeassistant.util", util),
+        ("homeassistant.util.dt", util_dt),
+        ("cuboai_pkg", pkg),
+    ):
+        monkeypatch.setitem(sys.modules, name, mod)
+
+    # The real utils (stdlib only), so the alert downloads run through the
+    # real gather_with_concurrency rather than the conftest stub.
+    for name in ("utils", "coordinator"):
+        spec = importlib.util.spec_from_file_location(
+            f"cuboai_pkg.{name}", REPO / "custom_components" / "cuboai" / f"{name}.py"
+        )
+        module = importlib.util.module_from_spec(spec)
+        monkeypatch.setitem(sys.modules, f"cuboai_pkg.{name}", module)
+        spec.loader.exec_module(module)
+    return module
+
+
+def _make_coordinator(monkeypatch, tmp_path, camera, local_results=(), download_images=False):
+    mod = _load_coordinator(monkeypatch)
+    state = AsyncMock(return_value={"state": "online"})
+    subscription = AsyncMock(return_value={"status": "active"})
+    monkeypatch.setattr(mod, "get_camera_state", state)
+    monkeypatch.setattr(mod, "get_subscription_info", subscription)
+    monkeypatch.setattr(mod, "get_camera_profiles_raw", AsyncMock(return_value=[]))
+    monkeypatch.setattr(mod, "get_n_alerts_paged", AsyncMock(return_value=[]))
+    local = iter(local_results)
+    monkeypatch.setattr(mod, "_fetch_local_data", lambda *a: next(local))
+
+    async def _run_in_executor(fn, *args):
+        return fn(*args)
+
+    hass = types.SimpleNamespace(
+        data={},
+        config=types.SimpleNamespace(path=lambda *parts: str(tmp_path.joinpath(*parts))),
+        async_add_executor_job=_run_in_executor,
+    )
+    entry = types.SimpleNamespace(
+        data={"cameras": [camera]}, options={"download_images": download_images, "camera_ip_DEV1": "192.168.1.20"}
+    )
+    return mod.CuboAICoordinator(hass, entry, "token", "refresh", "agent"), state, subscription
+
+
+async def test_not_due_queries_are_skipped_and_served_from_last(monkeypatch, tmp_path):
+    coordinator, state, subscription = _make_coordinator(monkeypatch, tmp_path, {"device_id": "DEV1"})
+
+    first = await coordinator._fetch_all(None)
+    second = await coordinator._fetch_all(None)
+
+    assert state.await_count == 1
+    assert subscription.await_count == 1
+    assert second["cameras"]["DEV1"]["camera_state"] == first["cameras"]["DEV1"]["camera_state"] == {"state": "online"}
+    assert second["subscription"] == {"status": "active"}
+
+
+async def test_state_backoff_resets_when_local_link_drops(monkeypatch, tmp_path):
+    camera = {"device_id": "DEV1", "uid": "UID1", "account": "a", "password": "p"}
+    coordinator, state, _ = _make_coordinator(monkeypatch, tmp_path, camera, [{"ok": 1}, {}, {}, {}])
+
+    for _ in range(4):
+        await coordinator._fetch_all(None)
+
+    # Poll 1 is the first query; poll 2 sees the local link drop and resets,
+    # so poll 3 re-asks the cloud; poll 4 is still failing locally but that
+    # is no new signal, so the backoff holds.
+    assert state.await_count == 2
+
+
+async def test_state_backoff_resets_when_local_link_comes_back(monkeypatch, tmp_path):
+    camera = {"device_id": "DEV1", "uid": "UID1", "account": "a", "password": "p"}
+    coordinator, state, _ = _make_coordinator(monkeypatch, tmp_path, camera, [{}, {}, {"ok": 1}, {"ok": 1}])
+
+    for _ in range(4):
+        await coordinator._fetch_all(None)
+
+    # Poll 3 sees the camera answer locally again and resets, so poll 4
+    # re-asks the cloud rather than serving a backed-off "offline".
+    assert state.await_count == 2
+
+
+async def test_always_reachable_camera_still_backs_off(monkeypatch, tmp_path):
+    camera = {"device_id": "DEV1", "uid": "UID1", "account": "a", "password": "p"}
+    coordinator, state, _ = _make_coordinator(monkeypatch, tmp_path, camera, [{"ok": 1}, {"ok": 1}, {"ok": 1}])
+
+    for _ in range(3):
+        await coordinator._fetch_all(None)
+
+    # A working first poll is not a change, so it does not cost a re-query.
+    assert state.await_count == 1
+
+
+async def test_never_reachable_camera_still_backs_off(monkeypatch, tmp_path):
+    camera = {"device_id": "DEV1", "uid": "UID1", "account": "a", "password": "p"}
+    coordinator, state, _ = _make_coordinator(monkeypatch, tmp_path, camera, [{}, {}, {}])
+
+    for _ in range(3):
+        await coordinator._fetch_all(None)
+
+    assert state.await_count == 1
+
+
+# ── alert image downloads ─────────────────────────────────────────────────
+
+
+async def test_alert_images_land_on_their_own_alerts(monkeypatch, tmp_path):
+    coordinator, _, _ = _make_coordinator(monkeypatch, tmp_path, {"device_id": "DEV1"}, download_images=True)
+    mod = sys.modules["cuboai_pkg.coordinator"]
+    alerts = [
+        {"type": "CRY", "id": "a1", "ts": 1, "image": "https://img/slow.jpg"},
+        {"type": "CRY", "id": "a2", "ts": 2, "image": "https://img/broken.jpg"},
+        {"type": "CRY", "id": "a3", "ts": 3, "image": None},
+        {"type": "CRY", "id": "a4", "ts": 4, "image": "https://img/fast.jpg"},
+    ]
+    monkeypatch.setattr(mod, "get_n_alerts_paged", AsyncMock(return_value=alerts))
+
+    async def _download(url, token, user_agent, images_dir, filename, session):
+        if "broken" in url:
+            raise OSError("HTTP 404")
+        # The first alert's photo finishes last, so a path matched up by
+        # completion order would land on the wrong alert.
+        await asyncio.sleep(0.01 if "slow" in url else 0)
+
+    monkeypatch.setattr(mod, "download_image", _download)
+
+    data = await coordinator._fetch_all(None)
+
+    images = {alert["id"]: alert["image"] for alert in data["cameras"]["DEV1"]["alerts"]}
+    assert images == {
+        "a1": "/local/cuboai_images/DEV1_a1.jpg",
+        "a2": None,
+        "a3": None,
+        "a4": "/local/cuboai_images/DEV1_a4.jpg",
+    }